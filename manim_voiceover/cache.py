@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import typing as t
+from pathlib import Path
+
+from manim import logger
+
+from manim_voiceover.defaults import (
+    DEFAULT_VOICEOVER_CACHE_DB_FILENAME,
+    DEFAULT_VOICEOVER_CACHE_JSON_FILENAME,
+)
+
+
+def hash_input_data(input_data: dict) -> str:
+    """Returns the cache key for a voiceover's ``input_data``.
+
+    The data is canonicalized (sorted keys, compact separators) before hashing,
+    so that the key does not depend on the order in which a service builds
+    its ``input_data`` dictionary.
+    """
+    dumped_data = json.dumps(
+        input_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(dumped_data.encode("utf-8")).hexdigest()
+
+
+class VoiceoverCache:
+    """Keyed store for voiceover cache entries, backed by an SQLite database
+    in the cache directory.
+
+    Entries are looked up by the hash of their ``input_data``, so a lookup
+    costs the same no matter how many voiceovers have been cached. Entries
+    from a ``cache.json`` file written by earlier versions are imported the
+    first time the directory is opened.
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir (str): The directory that holds the cached audio files.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.db_path = self.cache_dir / DEFAULT_VOICEOVER_CACHE_DB_FILENAME
+        self.json_path = self.cache_dir / DEFAULT_VOICEOVER_CACHE_JSON_FILENAME
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.db_path),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        with self._lock:
+            # In WAL mode a write only appends to the -wal file, and SQLite
+            # folds the log back into the database file on its own, so the
+            # cost of storing an entry does not grow with the cache.
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS transcriptions "
+                "(key TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+        self._migrate_json()
+
+    def _migrate_json(self) -> None:
+        """Imports the entries of a legacy ``cache.json`` file. The file is
+        only parsed again if it has changed since the last import."""
+        if not os.path.exists(self.json_path):
+            return
+
+        stat = os.stat(self.json_path)
+        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM meta WHERE key = 'json_signature'"
+            ).fetchone()
+        if row is not None and row[0] == signature:
+            return
+
+        try:
+            with open(self.json_path, "r") as f:
+                json_data = json.load(f)
+        except ValueError:
+            logger.warning(f"Could not parse {self.json_path}, skipping migration.")
+            return
+
+        if not isinstance(json_data, list):
+            raise ValueError("JSON file should be a list")
+
+        # The linear scan returned the first matching entry, so the first
+        # occurrence of each key wins here as well.
+        rows = [
+            (hash_input_data(entry["input_data"]), json.dumps(entry))
+            for entry in json_data
+            if "input_data" in entry
+        ]
+        with self._lock:
+            self._connection.execute("BEGIN")
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO entries (key, data) VALUES (?, ?)", rows
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) "
+                "VALUES ('json_signature', ?)",
+                (signature,),
+            )
+            self._connection.execute("COMMIT")
+        logger.info(
+            f"Imported {len(rows)} voiceover cache entries from {self.json_path}"
+        )
+
+    def get(self, input_data: dict) -> t.Optional[dict]:
+        """Returns the cache entry for ``input_data``, or None if there is none.
+
+        Args:
+            input_data (dict): The ``input_data`` the entry was created with.
+        """
+        key = hash_input_data(input_data)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def put(self, entry: dict) -> None:
+        """Stores a cache entry, replacing any entry with the same ``input_data``.
+
+        Args:
+            entry (dict): The output data dictionary of a speech service. Entries
+                without ``input_data`` cannot be looked up and are not stored.
+        """
+        if "input_data" not in entry:
+            return
+        key = hash_input_data(entry["input_data"])
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries (key, data) VALUES (?, ?)",
+                (key, json.dumps(entry)),
+            )
+
+    def get_transcription(self, key_data: dict) -> t.Optional[dict]:
+        """Returns a cached transcription, or None if there is none.
+
+        Transcriptions are stored apart from the voiceover entries, so that
+        they are shared by every voiceover with the same audio.
+
+        Args:
+            key_data (dict): The data that identifies the transcription, i.e.
+                the hash of the audio and the transcription settings.
+        """
+        key = hash_input_data(key_data)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM transcriptions WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def put_transcription(self, key_data: dict, transcription: dict) -> None:
+        """Stores a transcription.
+
+        Args:
+            key_data (dict): The data that identifies the transcription.
+            transcription (dict): The word boundaries and, if any, the
+                transcribed text.
+        """
+        key = hash_input_data(key_data)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO transcriptions (key, data) VALUES (?, ?)",
+                (key, json.dumps(transcription)),
+            )
+
+
+_caches: t.Dict[str, VoiceoverCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_voiceover_cache(cache_dir: str) -> VoiceoverCache:
+    """Returns the :class:`VoiceoverCache` for a cache directory. Services
+    sharing a directory share one store and one database connection."""
+    key = os.path.abspath(cache_dir)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = VoiceoverCache(cache_dir)
+        return _caches[key]
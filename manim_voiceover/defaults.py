@@ -2,6 +2,8 @@ from pathlib import Path
 
 DEFAULT_VOICEOVER_CACHE_DIR = "voiceovers"
 DEFAULT_VOICEOVER_CACHE_JSON_FILENAME = "cache.json"
+DEFAULT_VOICEOVER_CACHE_DB_FILENAME = "cache.db"
+DEFAULT_VOICEOVER_MANIFEST_DIR = "manifests"
 
 #: Available source languages for DeepL
 DEEPL_SOURCE_LANG = {
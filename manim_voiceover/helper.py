@@ -1,3 +1,4 @@
+import hashlib
 import importlib
 import json
 import re
@@ -6,6 +7,7 @@ import sys
 from typing import Union
 import pip
 import textwrap
+import numpy as np
 from pydub import AudioSegment
 from pathlib import Path
 from manim import logger
@@ -17,8 +19,55 @@ def chunks(lst: list, n: int):
         yield lst[i : i + n]
 
 
+def sha256_file(path: str, block_size: int = 1 << 20) -> str:
+    """Return the sha256 hex digest of a file's contents"""
+    hash_ = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            hash_.update(block)
+    return hash_.hexdigest()
+
+
+BOOKMARK_PATTERN = re.compile("<bookmark\s*mark\s*=['\"]\w*[\"']\s*/>")
+
+
 def remove_bookmarks(input: str) -> str:
-    return re.sub("<bookmark\s*mark\s*=['\"]\w*[\"']\s*/>", "", input)
+    return BOOKMARK_PATTERN.sub("", input)
+
+
+# Words that end with a period without ending a sentence
+ABBREVIATIONS = "mr mrs ms dr prof sr jr st vs etc e.g i.e cf fig approx ca".split()
+
+
+def split_sentences(text: str) -> list:
+    """Splits a text after each period, question mark or exclamation mark
+    that is followed by whitespace and an uppercase letter or a bookmark.
+    Periods after abbreviations and initials do not end a sentence. Bookmarks
+    stay with the sentence that follows them."""
+    text = text.strip()
+    sentences = []
+    start = 0
+    for match in re.finditer(r"[.!?]\s+", text):
+        next_start = match.end()
+        if not (text[next_start].isupper() or BOOKMARK_PATTERN.match(text, next_start)):
+            continue
+        if text[match.start()] == ".":
+            words = text[start : match.start()].split() or [""]
+            word = words[-1].lstrip("(\"'").lower()
+            if len(word) == 1 or word in ABBREVIATIONS:
+                continue
+        sentences.append(text[start : match.start() + 1])
+        start = next_start
+    sentences.append(text[start:])
+
+    # Bookmarks after the last sentence have no speech of their own
+    result = []
+    for sentence in sentences:
+        if result and not remove_bookmarks(sentence).strip():
+            result[-1] += " " + sentence
+        elif sentence:
+            result.append(sentence)
+    return result
 
 
 def wav2mp3(wav_path, mp3_path=None, remove_wav=True, bitrate="312k"):
@@ -62,23 +111,68 @@ def msg_box(msg, indent=1, width=None, title=None):
     return box
 
 
-def detect_leading_silence(sound, silence_threshold=-20.0, chunk_size=10):
+def get_samples(sound: AudioSegment) -> np.ndarray:
+    """Returns the interleaved samples of a pydub.AudioSegment as a NumPy
+    view of its raw data, without copying it."""
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[sound.sample_width]
+    return np.frombuffer(sound.raw_data, dtype=dtype)
+
+
+def detect_leading_silence(
+    sound, silence_threshold=-20.0, chunk_size=10, from_end=False
+):
     """
     sound is a pydub.AudioSegment
     silence_threshold in dB
     chunk_size in ms
+    from_end: detect the silence at the end of sound instead, without
+    reversing it
 
-    iterate over chunks until you find the first one with sound
+    find the first chunk with sound, computing the level of many chunks at
+    once
     """
-    trim_ms = 0  # ms
-
     assert chunk_size > 0  # to avoid infinite loop
-    while sound[
-        trim_ms : trim_ms + chunk_size
-    ].dBFS < silence_threshold and trim_ms < len(sound):
-        trim_ms += chunk_size
+    duration = len(sound)
+    n_chunks = -(-duration // chunk_size)
+    samples = get_samples(sound)
+    channels = sound.channels
+    n_frames = len(samples) // channels
+    # Chunks below the threshold in dBFS have a mean square below this. Like
+    # pydub, the RMS is rounded down to an integer
+    threshold = max(
+        1, np.ceil(sound.max_possible_amplitude * 10 ** (silence_threshold / 20))
+    )
+    threshold = threshold**2
+
+    # The frames at which chunks start, counted from the respective end,
+    # like pydub would slice them
+    bounds_ms = np.minimum(np.arange(n_chunks + 1) * chunk_size, duration)
+    bounds = np.minimum(
+        (bounds_ms * sound.frame_rate / 1000).astype(np.int64), n_frames
+    )
 
-    return trim_ms
+    # Look at a few seconds at a time, the silence is usually short
+    block_size = 4096
+    for k0 in range(0, n_chunks, block_size):
+        k1 = min(k0 + block_size, n_chunks)
+        if from_end:
+            block = samples[
+                (n_frames - bounds[k1]) * channels : (n_frames - bounds[k0]) * channels
+            ][::-1]
+        else:
+            block = samples[bounds[k0] * channels : bounds[k1] * channels]
+
+        cumsum = np.concatenate([[0.0], np.cumsum(block.astype(np.float64) ** 2)])
+        starts = (bounds[k0:k1] - bounds[k0]) * channels
+        ends = (bounds[k0 + 1 : k1 + 1] - bounds[k0]) * channels
+        counts = ends - starts
+        mean_squares = (cumsum[ends] - cumsum[starts]) / np.maximum(counts, 1)
+
+        loud = np.flatnonzero((counts > 0) & (mean_squares >= threshold))
+        if len(loud):
+            return int(k0 + loud[0]) * chunk_size
+
+    return n_chunks * chunk_size
 
 
 def trim_silence(
@@ -89,7 +183,9 @@ def trim_silence(
     buffer_end=200,
 ) -> AudioSegment:
     start_trim = detect_leading_silence(sound, silence_threshold, chunk_size)
-    end_trim = detect_leading_silence(sound.reverse(), silence_threshold, chunk_size)
+    end_trim = detect_leading_silence(
+        sound, silence_threshold, chunk_size, from_end=True
+    )
 
     # Remove buffer_len milliseconds from start_trim and end_trim
     start_trim = max(0, start_trim - buffer_start)
@@ -1,7 +1,13 @@
 import os
+import json
+import hashlib
 import sox
 import uuid
+import typing as t
 from mutagen.mp3 import MP3
+from pydub import AudioSegment
+
+from manim_voiceover.helper import sha256_file
 
 
 def adjust_speed(input_path: str, output_path: str, tempo: float) -> None:
@@ -18,6 +24,73 @@ def adjust_speed(input_path: str, output_path: str, tempo: float) -> None:
         os.rename(output_path, input_path)
 
 
+def get_speed_adjusted_audio(input_path: str, output_dir: str, tempo: float) -> str:
+    """Returns a copy of ``input_path`` played at ``tempo``, creating it only
+    if it does not exist yet.
+
+    The copy is named after the hash of the input audio, the tempo and the
+    output format, so it is shared by every voiceover (and every speech
+    service) with the same audio, and changing the tempo only creates a new
+    file next to the existing ones. The input file is never modified.
+
+    Args:
+        input_path (str): The audio file to adjust.
+        output_dir (str): The directory to store the adjusted audio in.
+        tempo (float): The tempo factor, e.g. 1.5 for 50% faster playback.
+
+    Returns:
+        str: The file name of the adjusted audio, relative to ``output_dir``.
+    """
+    ext = os.path.splitext(input_path)[1]
+    key_data = {"audio": sha256_file(input_path), "tempo": tempo, "format": ext}
+    key = hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf-8"))
+    filename = "adjusted-" + key.hexdigest()[:16] + ext
+    output_path = os.path.join(output_dir, filename)
+
+    if not os.path.exists(output_path):
+        # Build next to the target and move it in place, so that an
+        # interrupted render never leaves a truncated file behind
+        tmp_path = os.path.join(output_dir, str(uuid.uuid1()) + ext)
+        tfm = sox.Transformer()
+        tfm.tempo(tempo)
+        tfm.build(input_filepath=input_path, output_filepath=tmp_path)
+        os.replace(tmp_path, output_path)
+
+    return filename
+
+
+def get_concatenated_audio(input_paths: t.List[str], output_dir: str) -> str:
+    """Returns the concatenation of the audio files in ``input_paths``,
+    creating it only if it does not exist yet.
+
+    The output is named after the names of the input files. Cached audio
+    files are named after their input data, so the same list of files
+    always yields the same output.
+
+    Args:
+        input_paths (List[str]): The audio files to concatenate, in order.
+        output_dir (str): The directory to store the concatenated audio in.
+
+    Returns:
+        str: The file name of the concatenated audio, relative to ``output_dir``.
+    """
+    ext = os.path.splitext(input_paths[0])[1]
+    key_data = [os.path.basename(path) for path in input_paths]
+    key = hashlib.sha256(json.dumps(key_data).encode("utf-8"))
+    filename = "joined-" + key.hexdigest()[:16] + ext
+    output_path = os.path.join(output_dir, filename)
+
+    if not os.path.exists(output_path):
+        audio = AudioSegment.empty()
+        for path in input_paths:
+            audio += AudioSegment.from_file(path)
+        tmp_path = os.path.join(output_dir, str(uuid.uuid1()) + ext)
+        audio.export(tmp_path, format=ext[1:])
+        os.replace(tmp_path, output_path)
+
+    return filename
+
+
 def get_duration(path: str) -> float:
     audio = MP3(path)
     return audio.info.length
@@ -0,0 +1,236 @@
+import argparse
+import ast
+import importlib.util
+import json
+import os
+import sys
+import typing as t
+from pathlib import Path
+
+from manim import logger
+
+# Functions that voiceover texts are commonly wrapped in for translation
+GETTEXT_NAMES = ["_", "gettext"]
+
+
+def _get_scene_class(tree: ast.Module, scene_name: str) -> ast.ClassDef:
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef) and node.name == scene_name:
+            return node
+    raise ValueError(f"Scene {scene_name} not found")
+
+
+def _is_self_call(node: ast.AST, names: t.List[str]) -> bool:
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "self"
+        and node.func.attr in names
+    )
+
+
+def _eval_text(node: ast.AST, namespace: dict) -> t.Optional[str]:
+    """Returns the value of a string literal, or of a string literal wrapped
+    in a gettext function. Returns None for anything else."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id in GETTEXT_NAMES
+        and len(node.args) == 1
+        and not node.keywords
+    ):
+        inner = _eval_text(node.args[0], namespace)
+        if inner is None:
+            return None
+        translate = namespace.get(node.func.id)
+        return translate(inner) if callable(translate) else inner
+
+    return None
+
+
+def extract_voiceovers(
+    source: str, scene_name: str, namespace: t.Optional[dict] = None
+) -> t.List[dict]:
+    """Statically extracts the voiceovers of a scene from its source code,
+    without running it.
+
+    Only calls of ``self.voiceover()`` and ``self.add_voiceover_text()`` whose
+    text is a string literal, optionally wrapped in ``_()`` or ``gettext()``,
+    and whose other arguments are literals are returned. Others are skipped.
+
+    Args:
+        source (str): The source code of the module that defines the scene.
+        scene_name (str): The name of the scene class.
+        namespace (dict, optional): The namespace of the imported module, used
+            to look up the gettext function. Defaults to None.
+
+    Returns:
+        List[dict]: Dictionaries with the keys ``text`` and ``kwargs``, in
+        the order they appear in the source.
+    """
+    if namespace is None:
+        namespace = {}
+    scene_class = _get_scene_class(ast.parse(source), scene_name)
+
+    # ast.walk() is breadth-first, nested calls would come first
+    calls = sorted(
+        (
+            node
+            for node in ast.walk(scene_class)
+            if _is_self_call(node, ["voiceover", "add_voiceover_text"])
+        ),
+        key=lambda node: (node.lineno, node.col_offset),
+    )
+
+    voiceovers = []
+    for node in calls:
+
+        text_node = node.args[0] if node.args else None
+        kwargs = {}
+        try:
+            for keyword in node.keywords:
+                if keyword.arg == "text":
+                    text_node = keyword.value
+                elif keyword.arg is None:
+                    raise ValueError("Unpacked keyword arguments")
+                else:
+                    kwargs[keyword.arg] = ast.literal_eval(keyword.value)
+        except ValueError:
+            logger.debug(f"Skipping voiceover on line {node.lineno}")
+            continue
+
+        text = _eval_text(text_node, namespace) if text_node is not None else None
+        if text is None:
+            logger.debug(f"Skipping voiceover on line {node.lineno}")
+            continue
+
+        # Arguments used by the scene, not by the speech service
+        for key in ["subcaption", "max_subcaption_len", "subcaption_buff"]:
+            kwargs.pop(key, None)
+        voiceovers.append({"text": text, "kwargs": kwargs})
+
+    return voiceovers
+
+
+def extract_speech_service(source: str, scene_name: str, namespace: dict):
+    """Creates the speech service that a scene passes to
+    ``self.set_speech_service()``, by evaluating the argument in the
+    namespace of the scene's module.
+
+    Args:
+        source (str): The source code of the module that defines the scene.
+        scene_name (str): The name of the scene class.
+        namespace (dict): The namespace of the imported module.
+
+    Returns:
+        SpeechService: The speech service.
+    """
+    scene_class = _get_scene_class(ast.parse(source), scene_name)
+    for node in ast.walk(scene_class):
+        if _is_self_call(node, ["set_speech_service"]):
+            if node.args:
+                service_node = node.args[0]
+            else:
+                service_node = next(
+                    k.value for k in node.keywords if k.arg == "speech_service"
+                )
+            expression = ast.fix_missing_locations(ast.Expression(service_node))
+            try:
+                return eval(compile(expression, "<speech service>", "eval"), namespace)
+            except NameError as e:
+                raise ValueError(
+                    f"Could not create the speech service of {scene_name}: {e}. "
+                    "The arguments of set_speech_service() may only refer to "
+                    "names defined at module level."
+                )
+
+    raise ValueError(f"Scene {scene_name} does not call set_speech_service()")
+
+
+def import_scene_module(file: str) -> dict:
+    """Imports a scene file the way Manim does and returns its namespace."""
+    path = Path(file).resolve()
+    sys.path.insert(0, str(path.parent))
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[path.stem] = module
+    spec.loader.exec_module(module)
+    return vars(module)
+
+
+parser = argparse.ArgumentParser(description="Manim Voiceover utilities")
+subparsers = parser.add_subparsers(dest="command", required=True)
+
+prefetch_parser = subparsers.add_parser(
+    "prefetch",
+    help="Synthesize the voiceovers of a scene without rendering it",
+)
+prefetch_parser.add_argument("file", type=str, help="Python file with the scene")
+prefetch_parser.add_argument("scene", type=str, help="Name of the scene")
+prefetch_parser.add_argument(
+    "-j",
+    "--max-concurrency",
+    type=int,
+    default=8,
+    help="Number of voiceovers to synthesize at the same time",
+)
+prefetch_parser.add_argument(
+    "-l",
+    "--locale",
+    type=str,
+    default=None,
+    help="Locale for gettext, sets the LOCALE environment variable",
+)
+prefetch_parser.add_argument(
+    "-d",
+    "--domain",
+    type=str,
+    default=None,
+    help="Domain for gettext, sets the DOMAIN environment variable",
+)
+
+
+def prefetch(args) -> None:
+    # If file does not exist, raise error
+    if not os.path.exists(args.file):
+        raise FileNotFoundError(f"File {args.file} does not exist")
+
+    if args.locale is not None:
+        os.environ["LOCALE"] = args.locale
+    if args.domain is not None:
+        os.environ["DOMAIN"] = args.domain
+
+    with open(args.file, "r") as f:
+        source = f.read()
+
+    namespace = import_scene_module(args.file)
+    voiceovers = extract_voiceovers(source, args.scene, namespace)
+    speech_service = extract_speech_service(source, args.scene, namespace)
+    logger.info(f"Found {len(voiceovers)} voiceovers in {args.scene}")
+
+    # Voiceovers with the same arguments are synthesized in one batch
+    batches = {}
+    for voiceover in voiceovers:
+        key = json.dumps(voiceover["kwargs"], sort_keys=True)
+        batches.setdefault(key, []).append(voiceover["text"])
+
+    for key, texts in batches.items():
+        speech_service.generate_batch(
+            texts, max_concurrency=args.max_concurrency, **json.loads(key)
+        )
+
+    logger.info(f"Synthesized the voiceovers of {args.scene}")
+
+
+def main():
+    args = parser.parse_args()
+    if args.command == "prefetch":
+        prefetch(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,25 @@
+import asyncio
+import functools
+import io
 import os
+import re
 import sys
+import threading
+import typing as t
 from pathlib import Path
 
 from dotenv import find_dotenv, load_dotenv
 from manim import logger
+from pydub import AudioSegment
 
 from manim_voiceover.helper import (
+    BOOKMARK_PATTERN,
+    chunks,
     create_dotenv_file,
     prompt_ask_missing_extras,
     remove_bookmarks,
 )
-from manim_voiceover.services.base import SpeechService
+from manim_voiceover.services.base import RetryableError, SpeechService
 
 try:
     import azure.cognitiveservices.speech as speechsdk
@@ -22,6 +31,9 @@ except ImportError:
 
 load_dotenv(find_dotenv(usecwd=True))
 
+# Bookmarks that separate the voiceovers of a batch
+BATCH_MARK = "_voiceover_batch_%d"
+
 
 def serialize_word_boundary(wb):
     return {
@@ -34,6 +46,65 @@ def serialize_word_boundary(wb):
     }
 
 
+def remove_bookmark_offsets(word_boundaries: t.List[dict], text: str) -> None:
+    """Shifts the text offsets of word boundaries in place, so that they refer
+    to ``text`` with its bookmarks removed."""
+    tags = [(m.start(), m.end() - m.start()) for m in BOOKMARK_PATTERN.finditer(text)]
+    for wb in word_boundaries:
+        wb["text_offset"] -= sum(
+            length for start, length in tags if start < wb["text_offset"]
+        )
+
+
+def _set_future_result(future: asyncio.Future, result) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+class _PooledSynthesizer:
+    """A synthesizer that writes into memory, with its event handlers
+    connected once. The events are collected for the current request."""
+
+    def __init__(self, speech_config: "speechsdk.SpeechConfig"):
+        self.synthesizer = speechsdk.SpeechSynthesizer(
+            speech_config=speech_config, audio_config=None
+        )
+        self.initial_offset = 0
+        self.word_boundaries = []
+        self.bookmarks = []
+        self.on_done = None
+
+        self.synthesizer.synthesis_word_boundary.connect(self._on_word_boundary)
+        self.synthesizer.bookmark_reached.connect(self._on_bookmark)
+        self.synthesizer.synthesis_completed.connect(self._on_done)
+        self.synthesizer.synthesis_canceled.connect(self._on_done)
+
+    def reset(self, initial_offset: int, on_done: t.Optional[t.Callable] = None):
+        self.initial_offset = initial_offset
+        self.word_boundaries = []
+        self.bookmarks = []
+        self.on_done = on_done
+
+    def warm_up(self) -> None:
+        """Opens the connection to the service ahead of the first request."""
+        connection = speechsdk.Connection.from_speech_synthesizer(self.synthesizer)
+        connection.open(True)
+
+    def _on_word_boundary(self, evt):
+        # print(f'{type(evt)=}')
+        result = {label[1:]: val for label, val in evt.__dict__.items()}
+        result["boundary_type"] = result["boundary_type"].name
+        result["text_offset"] = result["text_offset"] - self.initial_offset
+        self.word_boundaries.append(result)
+
+    def _on_bookmark(self, evt):
+        self.bookmarks.append((evt.text, evt.audio_offset))
+
+    def _on_done(self, evt):
+        if self.on_done is not None:
+            self.on_done(evt.result)
+
+
 def create_dotenv_azure():
     logger.info(
         "Check out https://voiceover.manim.community/en/stable/services.html#azureservice to learn how to create an account and get your subscription key."
@@ -56,6 +127,8 @@ class AzureService(SpeechService):
         style: str = None,
         output_format: str = "Audio48Khz192KBitRateMonoMp3",
         prosody: dict = None,
+        native_bookmarks: bool = False,
+        max_batch_size: int = 1,
         **kwargs,
     ):
         """
@@ -64,6 +137,8 @@ class AzureService(SpeechService):
             style (str, optional): The style to use. See the `API page <https://learn.microsoft.com/en-us/azure/cognitive-services/speech-service/rest-text-to-speech?tabs=streaming#style>`__ to see how you can see available styles for a given voice. Defaults to None.
             output_format (str, optional): The output format to use. See the `API page <https://learn.microsoft.com/en-us/azure/cognitive-services/speech-service/rest-text-to-speech?tabs=streaming#audio-outputs>`__ for all the available options. Defaults to ``Audio48Khz192KBitRateMonoMp3``.
             prosody (dict, optional): Global prosody settings to use. See the `API page <https://learn.microsoft.com/en-us/azure/cognitive-services/speech-service/speech-synthesis-markup#adjust-prosody>`__ for all the available options. Defaults to None.
+            native_bookmarks (bool, optional): Whether to send bookmarks to Azure instead of removing them from the text. Azure then reports the exact time of each bookmark, which is used instead of interpolating it from the word boundaries. Defaults to False.
+            max_batch_size (int, optional): The maximum number of voiceovers that :meth:`generate_batch` synthesizes in a single request. The voiceovers are joined in one SSML document and the audio is split at bookmarks between them. Only MP3 output formats can be batched. Defaults to 1.
         """
         prompt_ask_missing_extras(
             "azure.cognitiveservices.speech", "azure", "AzureService"
@@ -73,17 +148,42 @@ class AzureService(SpeechService):
         self.style = style
         self.output_format = output_format
         self.prosody = prosody
+        self.native_bookmarks = native_bookmarks
+        if max_batch_size > 1 and "Mp3" not in output_format:
+            logger.warning(
+                f"Only MP3 output formats can be batched, {output_format} is not."
+            )
+            max_batch_size = 1
+        self.max_batch_size = max_batch_size
         SpeechService.__init__(self, **kwargs)
 
-    def generate_from_text(
-        self, text: str, cache_dir: str = None, path: str = None, **kwargs
-    ) -> dict:
-        """"""
+        # Synthesizers keep their connection open between requests. One is
+        # taken out of the pool per request, so that concurrent requests
+        # each get their own.
+        self._speech_config = None
+        self._synthesizer_pool = []
+        self._synthesizer_pool_lock = threading.Lock()
+
+        # Warm up a connection if the credentials are already available.
+        # Otherwise, they are asked for on the first cache miss.
+        if (
+            "AZURE_SUBSCRIPTION_KEY" in os.environ
+            and "AZURE_SERVICE_REGION" in os.environ
+        ):
+            try:
+                synthesizer = _PooledSynthesizer(self._get_speech_config())
+                synthesizer.warm_up()
+                self._synthesizer_pool.append(synthesizer)
+            except Exception as e:
+                logger.warning(f"Could not connect to Azure ahead of time: {e}")
+
+    def _build_ssml_parts(self, text: str, **kwargs) -> t.Tuple[str, str, str]:
+        """Returns the beginning, the body and the end of the SSML document
+        for a text."""
         inner = text
-        # Remove bookmarks
-        inner = remove_bookmarks(inner)
-        if cache_dir is None:
-            cache_dir = self.cache_dir
+        # Remove bookmarks, unless Azure should report them
+        if not self.native_bookmarks:
+            inner = remove_bookmarks(inner)
 
         # Apply prosody
         prosody = kwargs.get("prosody", self.prosody)
@@ -122,10 +222,17 @@ class AzureService(SpeechService):
             ssml_beginning = ssml_beginning + style_opening_tag
             ssml_end = style_closing_tag + ssml_end
 
+        return ssml_beginning, inner, ssml_end
+
+    def _build_ssml(self, text: str, **kwargs) -> t.Tuple[str, int]:
+        """Returns the SSML document for a text and the offset of the text
+        within the document."""
+        ssml_beginning, inner, ssml_end = self._build_ssml_parts(text, **kwargs)
         ssml = ssml_beginning + inner + ssml_end
-        initial_offset = len(ssml_beginning)
+        return ssml, len(ssml_beginning)
 
-        input_data = {
+    def _get_input_data(self, text: str, ssml: str) -> dict:
+        return {
             "input_text": text,
             "ssml": ssml,
             "service": "azure",
@@ -137,14 +244,9 @@ class AzureService(SpeechService):
             },
         }
 
-        cached_result = self.get_cached_result(input_data, cache_dir)
-        if cached_result is not None:
-            return cached_result
-
-        if path is None:
-            audio_path = self.get_audio_basename(input_data) + ".mp3"
-        else:
-            audio_path = path
+    def _get_speech_config(self) -> "speechsdk.SpeechConfig":
+        if self._speech_config is not None:
+            return self._speech_config
 
         try:
             azure_subscription_key = os.environ["AZURE_SUBSCRIPTION_KEY"]
@@ -162,37 +264,21 @@ class AzureService(SpeechService):
         speech_config.set_speech_synthesis_output_format(
             speechsdk.SpeechSynthesisOutputFormat[self.output_format]
         )
-        audio_config = speechsdk.audio.AudioOutputConfig(
-            filename=str(Path(cache_dir) / audio_path)
-        )
+        self._speech_config = speech_config
+        return speech_config
 
-        speech_service = speechsdk.SpeechSynthesizer(
-            speech_config=speech_config, audio_config=audio_config
-        )
-        word_boundaries = []
-        # speech_synthesizer.bookmark_reached.connect(lambda evt: print(
-        #     "Bookmark reached: {}, audio offset: {}ms, bookmark text: {}.".format(evt, evt.audio_offset, evt.text)))
-
-        def process_event(evt):
-            # print(f'{type(evt)=}')
-            result = {label[1:]: val for label, val in evt.__dict__.items()}
-            result["boundary_type"] = result["boundary_type"].name
-            result["text_offset"] = result["text_offset"] - initial_offset
-            return result
-
-        speech_service.synthesis_word_boundary.connect(
-            lambda evt: word_boundaries.append(process_event(evt))
-        )
-        speech_synthesis_result = speech_service.speak_ssml_async(ssml).get()
+    def _acquire_synthesizer(self) -> _PooledSynthesizer:
+        with self._synthesizer_pool_lock:
+            if self._synthesizer_pool:
+                return self._synthesizer_pool.pop()
+        return _PooledSynthesizer(self._get_speech_config())
 
-        json_dict = {
-            "input_text": text,
-            "input_data": input_data,
-            "ssml": ssml,
-            "word_boundaries": [serialize_word_boundary(wb) for wb in word_boundaries],
-            "original_audio": audio_path,
-        }
+    def _release_synthesizer(self, synthesizer: _PooledSynthesizer) -> None:
+        synthesizer.reset(0)
+        with self._synthesizer_pool_lock:
+            self._synthesizer_pool.append(synthesizer)
 
+    def _check_result(self, speech_synthesis_result) -> None:
         if (
             speech_synthesis_result.reason
             == speechsdk.ResultReason.SynthesizingAudioCompleted
@@ -200,6 +286,15 @@ class AzureService(SpeechService):
             pass
         elif speech_synthesis_result.reason == speechsdk.ResultReason.Canceled:
             cancellation_details = speech_synthesis_result.cancellation_details
+            if cancellation_details.error_code in [
+                speechsdk.CancellationErrorCode.TooManyRequests,
+                speechsdk.CancellationErrorCode.ConnectionFailure,
+                speechsdk.CancellationErrorCode.ServiceTimeout,
+                speechsdk.CancellationErrorCode.ServiceError,
+                speechsdk.CancellationErrorCode.ServiceUnavailable,
+            ]:
+                raise RetryableError(cancellation_details.error_details)
+
             logger.error(
                 "Speech synthesis canceled: {}".format(cancellation_details.reason)
             )
@@ -220,4 +315,256 @@ class AzureService(SpeechService):
 
             raise Exception("Speech synthesis failed")
 
+    def _collect_result(self, synthesizer: _PooledSynthesizer, result) -> tuple:
+        # Synthesizers that failed are not reused
+        self._check_result(result)
+        # Keep the events, they are cleared when the synthesizer is reused
+        word_boundaries = [
+            serialize_word_boundary(wb) for wb in synthesizer.word_boundaries
+        ]
+        bookmarks = synthesizer.bookmarks
+        self._release_synthesizer(synthesizer)
+        return result.audio_data, word_boundaries, bookmarks
+
+    def _synthesize(self, ssml: str, initial_offset: int) -> tuple:
+        """Synthesizes an SSML document.
+
+        Returns:
+            tuple: The audio data, the serialized word boundaries and a list of
+            ``(mark, audio_offset)`` pairs for the bookmarks that were reached.
+        """
+
+        def synthesize() -> tuple:
+            synthesizer = self._acquire_synthesizer()
+            synthesizer.reset(initial_offset)
+            result = synthesizer.synthesizer.speak_ssml_async(ssml).get()
+            return self._collect_result(synthesizer, result)
+
+        return self.rate_limiter.call(synthesize)
+
+    async def _asynthesize(self, ssml: str, initial_offset: int) -> tuple:
+        """Asynchronous version of :meth:`_synthesize`."""
+
+        async def synthesize() -> tuple:
+            # The SDK reports the result on its own threads. Hand it over to
+            # the event loop instead of blocking a thread on the result future.
+            loop = asyncio.get_running_loop()
+            done = loop.create_future()
+
+            def on_done(result):
+                loop.call_soon_threadsafe(_set_future_result, done, result)
+
+            synthesizer = self._acquire_synthesizer()
+            synthesizer.reset(initial_offset, on_done)
+            synthesizer.synthesizer.speak_ssml_async(ssml)
+            result = await done
+            return self._collect_result(synthesizer, result)
+
+        return await self.rate_limiter.acall(synthesize)
+
+    def _get_output_dict(
+        self,
+        text: str,
+        ssml: str,
+        word_boundaries: t.List[dict],
+        bookmarks: t.List[tuple],
+        audio_path: str,
+        **kwargs,
+    ) -> dict:
+        json_dict = {
+            "input_text": text,
+            "input_data": self._get_input_data(text, ssml),
+            "ssml": ssml,
+            "word_boundaries": word_boundaries,
+            "original_audio": audio_path,
+        }
+        if self.native_bookmarks:
+            _, inner, _ = self._build_ssml_parts(text, **kwargs)
+            remove_bookmark_offsets(word_boundaries, inner)
+            json_dict["bookmarks"] = dict(bookmarks)
         return json_dict
+
+    def generate_from_text(
+        self, text: str, cache_dir: str = None, path: str = None, **kwargs
+    ) -> dict:
+        """"""
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+
+        ssml, initial_offset = self._build_ssml(text, **kwargs)
+        input_data = self._get_input_data(text, ssml)
+
+        cached_result = self.get_cached_result(input_data, cache_dir)
+        if cached_result is not None:
+            return cached_result
+
+        if path is None:
+            audio_path = self.get_audio_basename(input_data) + ".mp3"
+        else:
+            audio_path = path
+
+        audio_data, word_boundaries, bookmarks = self._synthesize(ssml, initial_offset)
+        with open(Path(cache_dir) / audio_path, "wb") as f:
+            f.write(audio_data)
+
+        return self._get_output_dict(
+            text, ssml, word_boundaries, bookmarks, audio_path, **kwargs
+        )
+
+    async def agenerate_from_text(
+        self, text: str, cache_dir: str = None, path: str = None, **kwargs
+    ) -> dict:
+        """"""
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+
+        ssml, initial_offset = self._build_ssml(text, **kwargs)
+        input_data = self._get_input_data(text, ssml)
+
+        cached_result = self.get_cached_result(input_data, cache_dir)
+        if cached_result is not None:
+            return cached_result
+
+        if path is None:
+            audio_path = self.get_audio_basename(input_data) + ".mp3"
+        else:
+            audio_path = path
+
+        audio_data, word_boundaries, bookmarks = await self._asynthesize(
+            ssml, initial_offset
+        )
+        with open(Path(cache_dir) / audio_path, "wb") as f:
+            f.write(audio_data)
+
+        return self._get_output_dict(
+            text, ssml, word_boundaries, bookmarks, audio_path, **kwargs
+        )
+
+    async def _agenerate_joined(self, texts: t.List[str], **kwargs) -> t.List[dict]:
+        """Synthesizes several texts in one request and splits the audio at
+        bookmarks placed between them. Returns an output data dictionary for
+        each text, as :meth:`generate_from_text` would."""
+        ssml_beginning, _, ssml_end = self._build_ssml_parts(texts[0], **kwargs)
+        inners = [self._build_ssml_parts(text, **kwargs)[1] for text in texts]
+
+        inner = ""
+        text_starts = []
+        for idx, item in enumerate(inners):
+            if idx > 0:
+                inner += ' <bookmark mark="%s"/>' % (BATCH_MARK % idx)
+            text_starts.append(len(inner))
+            inner += item
+
+        audio_data, word_boundaries, bookmarks = await self._asynthesize(
+            ssml_beginning + inner + ssml_end, len(ssml_beginning)
+        )
+        bookmarks = dict(bookmarks)
+        try:
+            audio_starts = [0] + [
+                bookmarks.pop(BATCH_MARK % idx) for idx in range(1, len(texts))
+            ]
+        except KeyError:
+            raise Exception("Azure did not report the bookmarks between voiceovers")
+
+        loop = asyncio.get_running_loop()
+        audio = await loop.run_in_executor(
+            None,
+            functools.partial(
+                AudioSegment.from_file, io.BytesIO(audio_data), format="mp3"
+            ),
+        )
+
+        bitrate = re.search(r"(\d+)KBitRate", self.output_format)
+        json_dicts = []
+        for idx, text in enumerate(texts):
+            audio_start = audio_starts[idx]
+            text_start = text_starts[idx]
+            if idx + 1 < len(texts):
+                audio_end = audio_starts[idx + 1]
+                text_end = text_starts[idx + 1]
+            else:
+                audio_end = text_end = float("inf")
+
+            item_word_boundaries = []
+            for wb in word_boundaries:
+                if text_start <= wb["text_offset"] < text_end:
+                    wb = dict(wb)
+                    wb["text_offset"] -= text_start
+                    wb["audio_offset"] -= audio_start
+                    item_word_boundaries.append(wb)
+            item_bookmarks = [
+                (mark, offset - audio_start)
+                for mark, offset in bookmarks.items()
+                if audio_start <= offset < audio_end
+            ]
+
+            ssml, _ = self._build_ssml(text, **kwargs)
+            audio_path = (
+                self.get_audio_basename(self._get_input_data(text, ssml)) + ".mp3"
+            )
+            # Audio offsets are in ticks of 100 nanoseconds
+            segment = audio[
+                audio_start
+                // 10000 : (None if audio_end == float("inf") else audio_end // 10000)
+            ]
+            await loop.run_in_executor(
+                None,
+                functools.partial(
+                    segment.export,
+                    str(Path(self.cache_dir) / audio_path),
+                    format="mp3",
+                    bitrate=bitrate.group(1) + "k" if bitrate else None,
+                ),
+            )
+            json_dicts.append(
+                self._get_output_dict(
+                    text,
+                    ssml,
+                    item_word_boundaries,
+                    item_bookmarks,
+                    audio_path,
+                    **kwargs,
+                )
+            )
+
+        return json_dicts
+
+    async def agenerate_batch(
+        self, texts: t.List[str], max_concurrency: int = 8, **kwargs
+    ) -> t.List[dict]:
+        """"""
+        if self.max_batch_size > 1:
+            # Voiceovers that are not cached yet are synthesized in groups of
+            # up to max_batch_size, and cached like single voiceovers
+            pending = []
+            keys = [" ".join(text.split()) for text in texts]
+            # With sentence chunking, the sentences are what gets cached
+            keys = [i for key in keys for i in self._get_chunks(key) or [key]]
+            for text in dict.fromkeys(keys):
+                ssml, _ = self._build_ssml(text, **kwargs)
+                input_data = self._get_input_data(text, ssml)
+                if self.get_cached_result(input_data, self.cache_dir) is None:
+                    pending.append(text)
+
+            semaphore = asyncio.Semaphore(max_concurrency)
+            loop = asyncio.get_running_loop()
+
+            async def generate_joined(batch: t.List[str]) -> None:
+                async with semaphore:
+                    json_dicts = await self._agenerate_joined(batch, **kwargs)
+                for text, json_dict in zip(batch, json_dicts):
+                    await loop.run_in_executor(
+                        None,
+                        functools.partial(self._postprocess, text, json_dict, **kwargs),
+                    )
+
+            await asyncio.gather(
+                *[
+                    generate_joined(list(batch))
+                    for batch in chunks(pending, self.max_batch_size)
+                ]
+            )
+
+        return await SpeechService.agenerate_batch(
+            self, texts, max_concurrency=max_concurrency, **kwargs
+        )
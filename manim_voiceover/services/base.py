@@ -3,56 +3,245 @@ import typing as t
 import os
 import json
 import sys
+import asyncio
+import copy
+import functools
 import hashlib
+import importlib.util
+import random
+import threading
+import time
 from pathlib import Path
 from manim import config, logger
 from slugify import slugify
-from manim_voiceover.defaults import (
-    DEFAULT_VOICEOVER_CACHE_DIR,
-    DEFAULT_VOICEOVER_CACHE_JSON_FILENAME,
-)
+from manim_voiceover.cache import get_voiceover_cache
+from manim_voiceover.defaults import DEFAULT_VOICEOVER_CACHE_DIR
 from manim_voiceover.helper import (
-    append_to_json_file,
     prompt_ask_missing_extras,
     remove_bookmarks,
+    sha256_file,
+    split_sentences,
+)
+from manim_voiceover.modify_audio import (
+    get_concatenated_audio,
+    get_duration,
+    get_speed_adjusted_audio,
+)
+from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION, compute_voiceover_timing
+from manim_voiceover.transcription import (
+    get_num_workers,
+    get_transcription_backend,
+    transcribe_batch,
 )
-from manim_voiceover.modify_audio import adjust_speed
-from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
-
-
-def timestamps_to_word_boundaries(segments):
-    word_boundaries = []
-    current_text_offset = 0
-    for segment in segments:
-        for dict_ in segment["words"]:
-            word = dict_["word"]
-            word_boundaries.append(
-                {
-                    "audio_offset": int(dict_["start"] * AUDIO_OFFSET_RESOLUTION),
-                    # "duration_milliseconds": 0,
-                    "text_offset": current_text_offset,
-                    "word_length": len(word),
-                    "text": word,
-                    "boundary_type": "Word",
-                }
+
+# Moved to manim_voiceover.transcription, still importable from here
+from manim_voiceover.transcription import timestamps_to_word_boundaries  # noqa: F401
+
+
+def scale_audio_offsets(dict_: dict, factor: float) -> None:
+    """Scales the audio offsets of the word boundaries and bookmarks of an
+    output data dictionary in place, e.g. after changing the audio's speed."""
+    for word_boundary in dict_.get("word_boundaries", []):
+        word_boundary["audio_offset"] = int(word_boundary["audio_offset"] * factor)
+    bookmarks = dict_.get("bookmarks", {})
+    for mark in bookmarks:
+        bookmarks[mark] = int(bookmarks[mark] * factor)
+
+
+#: HTTP status codes of responses that are worth retrying
+RETRY_STATUS_CODES = [408, 409, 425, 429, 500, 502, 503, 504]
+
+
+class RetryableError(Exception):
+    """Raised by speech services for transient errors, e.g. when the API is
+    overloaded, so that :class:`RateLimiter` retries the request."""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Returns whether an error raised by a TTS API is likely to be transient.
+    Covers :class:`RetryableError`, connection errors and errors that carry a
+    status code from :data:`RETRY_STATUS_CODES`, as raised by most HTTP based
+    SDKs."""
+    if isinstance(error, (RetryableError, ConnectionError, TimeoutError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code in RETRY_STATUS_CODES
+
+
+class RateLimiter:
+    """Limits the requests that a speech service sends to its API, and retries
+    failed requests with exponential backoff and jitter.
+
+    Requests are throttled with a token bucket that holds up to ``burst``
+    tokens and is refilled at ``requests_per_second``. At most
+    ``max_concurrency`` requests run at the same time. The limiter works for
+    threads and for coroutines alike, and is shared by all instances of a
+    service with the same settings, see :func:`get_rate_limiter`.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: t.Optional[float] = None,
+        burst: int = 1,
+        max_concurrency: t.Optional[int] = None,
+        max_retries: int = 5,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        """
+        Args:
+            requests_per_second (float, optional): The sustained request rate.
+                Defaults to None, which means no limit.
+            burst (int, optional): The number of requests that may be sent at
+                once after a pause. Defaults to 1.
+            max_concurrency (int, optional): The maximum number of requests in
+                flight. Defaults to None, which means no limit.
+            max_retries (int, optional): How often to retry a failed request.
+                Defaults to 5.
+            initial_backoff (float, optional): The backoff before the first
+                retry, in seconds. Doubles with every retry. Defaults to 1.
+            max_backoff (float, optional): The maximum backoff, in seconds.
+                Defaults to 60.
+        """
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._in_flight = 0
+
+    def _reserve(self) -> float:
+        """Takes a token from the bucket and returns how long the caller has to
+        wait before the token is valid."""
+        if self.requests_per_second is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst,
+                self._tokens + (now - self._last_refill) * self.requests_per_second,
             )
-            current_text_offset += len(word)
-            # If word is not punctuation, add a space
-            # if word not in [".", ",", "!", "?", ";", ":", "(", ")"]:
-            # current_text_offset += 1
+            self._last_refill = now
+            # Tokens may go negative, which queues the callers up in order
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.requests_per_second
+
+    def _try_enter(self) -> bool:
+        with self._lock:
+            if self.max_concurrency is not None:
+                if self._in_flight >= self.max_concurrency:
+                    return False
+            self._in_flight += 1
+            return True
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _get_backoff(self, attempt: int, error: Exception) -> float:
+        # Respect the server's Retry-After header if there is one
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            return min(float(headers.get("retry-after")), self.max_backoff)
+        except (TypeError, ValueError):
+            pass
+        # "Full jitter", spreads out the retries of concurrent requests
+        backoff = min(self.max_backoff, self.initial_backoff * 2**attempt)
+        return random.uniform(0, backoff)
+
+    def call(self, func: t.Callable, *args, **kwargs):
+        """Calls ``func`` within the limits, retrying transient errors.
+
+        Args:
+            func (Callable): The function that sends the request.
+            *args: Positional arguments for ``func``.
+            **kwargs: Keyword arguments for ``func``.
+
+        Returns:
+            The return value of ``func``.
+        """
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._reserve())
+            while not self._try_enter():
+                time.sleep(0.01)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                backoff = self._get_backoff(attempt, e)
+                logger.warning(f"Request failed ({e}), retrying in {backoff:.1f}s")
+            finally:
+                self._exit()
+            time.sleep(backoff)
+
+    async def acall(self, func: t.Callable[..., t.Awaitable], *args, **kwargs):
+        """Asynchronous version of :meth:`call`, for coroutine functions."""
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._reserve())
+            while not self._try_enter():
+                await asyncio.sleep(0.01)
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                backoff = self._get_backoff(attempt, e)
+                logger.warning(f"Request failed ({e}), retrying in {backoff:.1f}s")
+            finally:
+                self._exit()
+            await asyncio.sleep(backoff)
+
+
+_rate_limiters: t.Dict[tuple, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
 
-    return word_boundaries
+
+def get_rate_limiter(service_name: str, **kwargs) -> RateLimiter:
+    """Returns the :class:`RateLimiter` of a service. Services with the same
+    name and settings share one limiter, and with it one token bucket.
+
+    Args:
+        service_name (str): The name of the service.
+        **kwargs: Keyword arguments passed to :class:`RateLimiter`.
+    """
+    key = (service_name, tuple(sorted(kwargs.items())))
+    with _rate_limiters_lock:
+        if key not in _rate_limiters:
+            _rate_limiters[key] = RateLimiter(**kwargs)
+        return _rate_limiters[key]
 
 
 class SpeechService(ABC):
     """Abstract base class for a speech service."""
 
+    #: Whether :meth:`generate_from_text` can run in several threads at once.
+    #: Services that drive a local engine or a microphone set this to False.
+    thread_safe: bool = True
+
     def __init__(
         self,
         global_speed: float = 1.00,
         cache_dir: t.Optional[str] = None,
         transcription_model: t.Optional[str] = None,
         transcription_kwargs: dict = {},
+        transcription_backend: t.Optional[str] = None,
+        preload_transcription_model: bool = False,
+        align_transcription: bool = False,
+        transcription_workers: t.Optional[int] = None,
+        requests_per_second: t.Optional[float] = None,
+        max_concurrent_requests: t.Optional[int] = None,
+        max_retries: int = 5,
+        sentence_chunking: bool = False,
         **kwargs,
     ):
         """
@@ -63,11 +252,55 @@ class SpeechService(ABC):
                 files to. Defaults to ``voiceovers/``.
             transcription_model (str, optional): The
                 `OpenAI Whisper model <https://github.com/openai/whisper#available-models-and-languages>`_
-                to use for transcription. Defaults to None.
+                to use for transcription. The transcription backend can be
+                given as a prefix, e.g. ``faster-whisper:base``. Defaults to None.
             transcription_kwargs (dict, optional): Keyword arguments to
                 pass to the transcribe() function. Defaults to {}.
+            transcription_backend (str, optional): The transcription backend
+                to use, ``stable-ts`` or ``faster-whisper``. See
+                :mod:`manim_voiceover.transcription`. Defaults to None, which
+                means the prefix of ``transcription_model``, or ``stable-ts``.
+            preload_transcription_model (bool, optional): Whether to load the
+                transcription model in a background thread right away. By
+                default, it is loaded on the first voiceover that needs to be
+                transcribed, so renders with only cached voiceovers never load
+                it. Defaults to False.
+            align_transcription (bool, optional): Whether to align the known
+                text of a voiceover to its audio, instead of transcribing the
+                audio. Alignment is faster and the word boundaries match the
+                text exactly. Only the ``language`` key of
+                ``transcription_kwargs`` is used. Defaults to False.
+            transcription_workers (int, optional): The number of processes
+                that :meth:`generate_batch` transcribes new voiceovers in.
+                Each process loads its own copy of the model. Set it to 1 to
+                transcribe one voiceover after the other in this process.
+                Defaults to None, which means up to
+                :data:`~manim_voiceover.transcription.DEFAULT_MAX_WORKERS`
+                processes, or 1 if the model runs on a GPU.
+            requests_per_second (float, optional): The maximum rate of requests
+                sent to the API of a network service. Defaults to None, which
+                means no limit.
+            max_concurrent_requests (int, optional): The maximum number of
+                requests in flight to the API of a network service. Defaults
+                to None, which means no limit.
+            max_retries (int, optional): How often to retry a request that
+                failed with a transient error, such as a 429 response.
+                Defaults to 5.
+            sentence_chunking (bool, optional): Whether to synthesize and
+                cache each sentence of a voiceover on its own, and join them
+                into one audio file. Editing one sentence of a paragraph then
+                only synthesizes that sentence again. Defaults to False.
         """
         self.global_speed = global_speed
+        self.align_transcription = align_transcription
+        self.transcription_workers = transcription_workers
+        self.sentence_chunking = sentence_chunking
+        self.rate_limiter = get_rate_limiter(
+            type(self).__name__,
+            requests_per_second=requests_per_second,
+            max_concurrency=max_concurrent_requests,
+            max_retries=max_retries,
+        )
 
         if cache_dir is not None:
             self.cache_dir = cache_dir
@@ -78,85 +311,439 @@ class SpeechService(ABC):
             os.makedirs(self.cache_dir)
 
         self.transcription_model = None
-        self._whisper_model = None
-        self.set_transcription(model=transcription_model, kwargs=transcription_kwargs)
+        self.transcription_backend = None
+        self._generate_lock = threading.Lock()
+        self.set_transcription(
+            model=transcription_model,
+            kwargs=transcription_kwargs,
+            preload=preload_transcription_model,
+            backend=transcription_backend,
+        )
+        if (
+            self.align_transcription
+            and self.transcription_backend is not None
+            and not self.transcription_backend.supports_alignment
+        ):
+            logger.warning(
+                f"The {self.transcription_backend.name} transcription backend "
+                "cannot align texts, voiceovers are transcribed instead."
+            )
 
         self.additional_kwargs = kwargs
 
+    def _is_final(self, dict_: dict) -> bool:
+        """Returns whether a cache entry has already been post-processed with
+        the current settings and can be used as is."""
+        if "final_audio" not in dict_:
+            return False
+        if dict_.get("global_speed", 1.0) != self.global_speed:
+            return False
+        if "word_boundaries" not in dict_ and self.transcription_model is not None:
+            return False
+        # Entries from before the timing was stored are upgraded once
+        if "timing" not in dict_:
+            return False
+        return True
+
+    def _get_chunks(self, text: str, path: str = None) -> t.List[str]:
+        """Returns the sentences to synthesize separately, or an empty list if
+        the text is synthesized as a whole."""
+        if not self.sentence_chunking or path is not None:
+            return []
+        sentences = split_sentences(text)
+        return sentences if len(sentences) > 1 else []
+
+    def _join_chunks(self, text: str, dicts: t.List[dict]) -> dict:
+        """Joins the output data dictionaries of the sentences of a text into
+        one, shifting the offsets of each sentence by the ones before it."""
+        final_audio = get_concatenated_audio(
+            [str(Path(self.cache_dir) / dict_["final_audio"]) for dict_ in dicts],
+            str(self.cache_dir),
+        )
+        joined = {
+            "input_text": text,
+            "original_audio": final_audio,
+            "final_audio": final_audio,
+            "global_speed": self.global_speed,
+        }
+
+        word_boundaries = []
+        bookmarks = {}
+        transcribed_text = ""
+        audio_offset = 0
+        text_offset = 0
+        for dict_ in dicts:
+            for word_boundary in dict_.get("word_boundaries", []):
+                word_boundary = dict(word_boundary)
+                word_boundary["audio_offset"] += audio_offset
+                word_boundary["text_offset"] += text_offset
+                word_boundaries.append(word_boundary)
+            for mark, offset in dict_.get("bookmarks", {}).items():
+                bookmarks[mark] = offset + audio_offset
+
+            # Transcriptions keep the space in front of each word
+            if "transcribed_text" in dict_:
+                chunk_text = dict_["transcribed_text"]
+            else:
+                chunk_text = remove_bookmarks(dict_["input_text"]) + " "
+            transcribed_text += chunk_text
+            text_offset += len(chunk_text)
+            audio_offset += int(dict_["timing"]["duration"] * AUDIO_OFFSET_RESOLUTION)
+
+        if all("word_boundaries" in dict_ for dict_ in dicts):
+            joined["word_boundaries"] = word_boundaries
+        if bookmarks:
+            joined["bookmarks"] = bookmarks
+        if all("transcribed_text" in dict_ for dict_ in dicts):
+            joined["transcribed_text"] = transcribed_text
+        joined["timing"] = compute_voiceover_timing(
+            joined, audio_offset / AUDIO_OFFSET_RESOLUTION
+        )
+        return joined
+
     def _wrap_generate_from_text(self, text: str, path: str = None, **kwargs) -> dict:
         # Replace newlines with lines, reduce multiple consecutive spaces to single
         text = " ".join(text.split())
 
+        # Each sentence is cached on its own
+        sentences = self._get_chunks(text, path)
+        if sentences:
+            dicts = [self._wrap_generate_chunk(i, **kwargs) for i in sentences]
+            return self._join_chunks(text, dicts)
+
+        return self._wrap_generate_chunk(text, path=path, **kwargs)
+
+    def _wrap_generate_chunk(self, text: str, path: str = None, **kwargs) -> dict:
         dict_ = self.generate_from_text(text, cache_dir=None, path=path, **kwargs)
+        return self._postprocess(text, dict_, **kwargs)
+
+    async def _wrap_agenerate_from_text(
+        self, text: str, path: str = None, **kwargs
+    ) -> dict:
+        text = " ".join(text.split())
+
+        sentences = self._get_chunks(text, path)
+        if sentences:
+            dicts = await asyncio.gather(
+                *[self._wrap_agenerate_chunk(i, **kwargs) for i in sentences]
+            )
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._join_chunks, text, dicts)
+
+        return await self._wrap_agenerate_chunk(text, path=path, **kwargs)
+
+    async def _wrap_agenerate_chunk(
+        self, text: str, path: str = None, **kwargs
+    ) -> dict:
+        dict_ = await self.agenerate_from_text(
+            text, cache_dir=None, path=path, **kwargs
+        )
+        if self._is_final(dict_):
+            dict_["input_text"] = text
+            return dict_
+
+        # Transcription and sox are blocking, keep them off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self._postprocess, text, dict_, **kwargs)
+        )
+
+    def _postprocess(self, text: str, dict_: dict, **kwargs) -> dict:
+        # Fast path: the cached entry is final, there is nothing left to do.
+        # Services strip bookmarks from the input data, so the cached entry
+        # may have been created with bookmarks at other positions.
+        if self._is_final(dict_):
+            dict_["input_text"] = text
+            return dict_
+
         original_audio = dict_["original_audio"]
+        # Entries returned from the cache have been post-processed before
+        from_cache = "final_audio" in dict_
+
+        # Bring cached word boundaries back to the timing of the original audio
+        if "global_speed" in dict_:
+            previous_speed = dict_["global_speed"]
+        elif from_cache and dict_["final_audio"] != original_audio:
+            # Legacy entries do not record their speed, but their offsets
+            # were scaled to the speed of the scene that rendered them
+            previous_speed = self.global_speed
+        else:
+            previous_speed = 1.0
+        if from_cache and previous_speed != 1:
+            scale_audio_offsets(dict_, previous_speed)
 
         # Check whether word boundaries exist and if not run stt
-        if "word_boundaries" not in dict_ and self._whisper_model is not None:
-            transcription_result = self._whisper_model.transcribe(
-                str(Path(self.cache_dir) / original_audio), **self.transcription_kwargs
-            )
-            logger.info("Transcription: " + transcription_result.text)
-            word_boundaries = timestamps_to_word_boundaries(
-                transcription_result.segments_to_dicts()
-            )
-            dict_["word_boundaries"] = word_boundaries
-            dict_["transcribed_text"] = transcription_result.text
+        if "word_boundaries" not in dict_ and self.transcription_model is not None:
+            if (
+                self.align_transcription
+                and self.transcription_backend.supports_alignment
+            ):
+                self._align(text, dict_)
+            else:
+                self._transcribe(dict_)
 
-        # Audio callback
-        self.audio_callback(original_audio, dict_, **kwargs)
+        # Audio callback, only for newly generated audio
+        if not from_cache:
+            self.audio_callback(original_audio, dict_, **kwargs)
 
         if self.global_speed != 1:
-            split_path = os.path.splitext(original_audio)
-            adjusted_path = split_path[0] + "_adjusted" + split_path[1]
-
-            adjust_speed(
-                str(Path(self.cache_dir) / dict_["original_audio"]),
-                str(Path(self.cache_dir) / adjusted_path),
+            dict_["final_audio"] = get_speed_adjusted_audio(
+                str(Path(self.cache_dir) / original_audio),
+                str(self.cache_dir),
                 self.global_speed,
             )
-            dict_["final_audio"] = adjusted_path
-            if "word_boundaries" in dict_:
-                for word_boundary in dict_["word_boundaries"]:
-                    word_boundary["audio_offset"] = int(
-                        word_boundary["audio_offset"] / self.global_speed
-                    )
+            scale_audio_offsets(dict_, 1 / self.global_speed)
         else:
             dict_["final_audio"] = dict_["original_audio"]
 
-        append_to_json_file(
-            Path(self.cache_dir) / DEFAULT_VOICEOVER_CACHE_JSON_FILENAME, dict_
+        # Store the entry as final, so that the next render takes the fast path
+        dict_["global_speed"] = self.global_speed
+        dict_["input_text"] = text
+        dict_["timing"] = compute_voiceover_timing(
+            dict_, get_duration(Path(self.cache_dir) / dict_["final_audio"])
         )
+        get_voiceover_cache(self.cache_dir).put(dict_)
         return dict_
 
-    def set_transcription(self, model: str = None, kwargs: dict = {}):
+    def _get_transcription_key(self, audio_path: str, text: str = None) -> dict:
+        key_data = {
+            "audio": sha256_file(audio_path),
+            "transcription": self.transcription_backend.cache_key,
+            "kwargs": self.transcription_kwargs,
+        }
+        if text is not None:
+            key_data["aligned_text"] = text
+        return key_data
+
+    def _transcribe(self, dict_: dict) -> None:
+        """Adds word boundaries from transcribing the original audio. The
+        result is cached by the hash of the audio, so identical audio is only
+        transcribed once."""
+        audio_path = str(Path(self.cache_dir) / dict_["original_audio"])
+        cache = get_voiceover_cache(self.cache_dir)
+        key_data = self._get_transcription_key(audio_path)
+        transcription = cache.get_transcription(key_data)
+        if transcription is None:
+            # The backend serializes the use of models shared between services
+            word_boundaries, transcribed_text = self.transcription_backend.transcribe(
+                audio_path, **self.transcription_kwargs
+            )
+            logger.info("Transcription: " + transcribed_text)
+            transcription = {
+                "word_boundaries": word_boundaries,
+                "transcribed_text": transcribed_text,
+            }
+            cache.put_transcription(key_data, transcription)
+        dict_.update(transcription)
+
+    def _align(self, text: str, dict_: dict) -> None:
+        """Adds word boundaries from aligning the text to the original audio.
+        Their text offsets refer to the text without bookmarks, so no
+        ``transcribed_text`` is stored."""
+        net_text = remove_bookmarks(text)
+        audio_path = str(Path(self.cache_dir) / dict_["original_audio"])
+        cache = get_voiceover_cache(self.cache_dir)
+        key_data = self._get_transcription_key(audio_path, net_text)
+        transcription = cache.get_transcription(key_data)
+        if transcription is None:
+            word_boundaries = self.transcription_backend.align(
+                audio_path,
+                net_text,
+                language=self.transcription_kwargs.get("language", "en"),
+            )
+            transcription = {"word_boundaries": word_boundaries}
+            cache.put_transcription(key_data, transcription)
+        dict_.update(transcription)
+
+    def _transcribe_batch(self, items: t.List[t.Tuple[str, dict]]) -> None:
+        """Transcribes the voiceovers without word boundaries in a pool of
+        processes, see :func:`~manim_voiceover.transcription.transcribe_batch`.
+        The results go to the transcription cache, where
+        :meth:`_postprocess` finds them.
+
+        Args:
+            items (List[Tuple[str, dict]]): The texts and output data
+                dictionaries of the voiceovers.
+        """
+        if self.transcription_backend is None:
+            return
+        align = (
+            self.align_transcription and self.transcription_backend.supports_alignment
+        )
+
+        cache = get_voiceover_cache(self.cache_dir)
+        pending = []
+        for text, dict_ in items:
+            if "word_boundaries" in dict_:
+                continue
+            audio_path = str(Path(self.cache_dir) / dict_["original_audio"])
+            net_text = remove_bookmarks(text) if align else None
+            key_data = self._get_transcription_key(audio_path, net_text)
+            if cache.get_transcription(key_data) is None:
+                pending.append((audio_path, net_text, key_data))
+        # A single voiceover is not worth starting processes for. Checked
+        # first, as finding out whether the model runs on a GPU may import
+        # torch
+        if len(pending) < 2:
+            return
+        # A single process would only load another copy of the model
+        num_workers = get_num_workers(
+            self.transcription_backend, len(pending), self.transcription_workers
+        )
+        if num_workers < 2:
+            return
+
+        results = transcribe_batch(
+            self.transcription_backend,
+            [audio_path for audio_path, _, _ in pending],
+            kwargs=self.transcription_kwargs,
+            texts=[net_text for _, net_text, _ in pending] if align else None,
+            language=self.transcription_kwargs.get("language", "en"),
+            max_workers=num_workers,
+        )
+        for (_, _, key_data), (word_boundaries, transcribed_text) in zip(
+            pending, results
+        ):
+            transcription = {"word_boundaries": word_boundaries}
+            if transcribed_text is not None:
+                transcription["transcribed_text"] = transcribed_text
+            cache.put_transcription(key_data, transcription)
+
+    def generate_batch(
+        self, texts: t.List[str], max_concurrency: int = 8, **kwargs
+    ) -> t.List[dict]:
+        """Synthesizes many voiceovers at once, e.g. to fill the cache before
+        rendering. Each voiceover goes through the same post-processing as in
+        a scene. Services with native batch support can override this method.
+
+        This runs :meth:`agenerate_batch` in a new event loop. From code that
+        already runs in an event loop, await :meth:`agenerate_batch` instead.
+
+        Args:
+            texts (List[str]): The texts to synthesize speech from.
+            max_concurrency (int, optional): The maximum number of voiceovers
+                to synthesize at the same time. Ignored for services that are
+                not :attr:`thread_safe`. Defaults to 8.
+            **kwargs: Keyword arguments passed on for every text.
+
+        Returns:
+            List[dict]: The output data dictionaries, in the order of ``texts``.
+        """
+        return asyncio.run(
+            self.agenerate_batch(texts, max_concurrency=max_concurrency, **kwargs)
+        )
+
+    async def agenerate_batch(
+        self, texts: t.List[str], max_concurrency: int = 8, **kwargs
+    ) -> t.List[dict]:
+        """Asynchronous version of :meth:`generate_batch`."""
+        # Identical texts are synthesized only once
+        keys = [" ".join(text.split()) for text in texts]
+        unique_keys = list(dict.fromkeys(keys))
+
+        if not self.thread_safe:
+            max_concurrency = 1
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        # With sentence chunking, the sentences are synthesized and cached
+        chunks_ = {key: self._get_chunks(key) or [key] for key in unique_keys}
+        chunk_texts = list(
+            dict.fromkeys(text for key in unique_keys for text in chunks_[key])
+        )
+
+        async def synthesize(text: str) -> dict:
+            async with semaphore:
+                return await self.agenerate_from_text(text, cache_dir=None, **kwargs)
+
+        dicts = await asyncio.gather(*[synthesize(text) for text in chunk_texts])
+
+        # Transcribe all new voiceovers at once, instead of one by one
+        # while post-processing them
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, self._transcribe_batch, list(zip(chunk_texts, dicts))
+        )
+
+        async def postprocess(text: str, dict_: dict) -> dict:
+            if self._is_final(dict_):
+                dict_["input_text"] = text
+                return dict_
+            async with semaphore:
+                return await loop.run_in_executor(
+                    None, functools.partial(self._postprocess, text, dict_, **kwargs)
+                )
+
+        dicts = await asyncio.gather(
+            *[postprocess(text, dict_) for text, dict_ in zip(chunk_texts, dicts)]
+        )
+        dicts = dict(zip(chunk_texts, dicts))
+
+        results = {}
+        for key in unique_keys:
+            if len(chunks_[key]) > 1:
+                results[key] = await loop.run_in_executor(
+                    None, self._join_chunks, key, [dicts[i] for i in chunks_[key]]
+                )
+            else:
+                results[key] = dicts[key]
+        return [copy.deepcopy(results[key]) for key in keys]
+
+    def set_transcription(
+        self,
+        model: str = None,
+        kwargs: dict = {},
+        preload: bool = False,
+        backend: t.Optional[str] = None,
+    ):
         """Set the transcription model and keyword arguments to be passed
-        to the transcribe() function.
+        to the transcribe() function. The model is loaded when it is first
+        needed.
 
         Args:
-            model (str, optional): The Whisper model to use for transcription. Defaults to None.
+            model (str, optional): The Whisper model to use for transcription, optionally prefixed with the backend, e.g. ``faster-whisper:base``. Defaults to None.
             kwargs (dict, optional): Keyword arguments to pass to the transcribe() function. Defaults to {}.
+            preload (bool, optional): Whether to load the model in a background thread right away. Defaults to False.
+            backend (str, optional): The transcription backend to use. Defaults to None, which means the prefix of ``model``, or ``stable-ts``.
         """
-        if model != self.transcription_model:
+        current_backend = (
+            self.transcription_backend.name if self.transcription_backend else None
+        )
+        if model != self.transcription_model or (
+            backend is not None and backend != current_backend
+        ):
+            if self.transcription_backend is not None:
+                self.transcription_backend.release()
+                self.transcription_backend = None
+
             if model is not None:
-                try:
-                    import whisper as __tmp
-                    import stable_whisper as whisper
-                except ImportError:
+                transcription_backend = get_transcription_backend(
+                    model, backend=backend
+                )
+                # Check for the packages without importing them, importing
+                # them also imports torch
+                if any(
+                    importlib.util.find_spec(name) is None
+                    for name in transcription_backend.required_modules
+                ):
                     logger.error(
-                        'Missing packages. Run `pip install "manim-voiceover[transcribe]"` to be able to transcribe voiceovers.'
+                        f'Missing packages. Run `pip install "manim-voiceover[{transcription_backend.extras}]"` to be able to transcribe voiceovers.'
                     )
-
-                prompt_ask_missing_extras(
-                    ["whisper", "stable_whisper"],
-                    "transcribe",
-                    "SpeechService.set_transcription()",
-                )
-                self._whisper_model = whisper.load_model(model)
-            else:
-                self._whisper_model = None
+                    prompt_ask_missing_extras(
+                        transcription_backend.required_modules,
+                        transcription_backend.extras,
+                        "SpeechService.set_transcription()",
+                    )
+                self.transcription_backend = transcription_backend
+            self.transcription_model = model
 
         self.transcription_kwargs = kwargs
 
+        transcription_backend = self.transcription_backend
+        if preload and transcription_backend is not None:
+            threading.Thread(
+                target=lambda: transcription_backend.model, daemon=True
+            ).start()
+
     def get_audio_basename(self, data: dict) -> str:
         dumped_data = json.dumps(data)
         data_hash = hashlib.sha256(dumped_data.encode("utf-8")).hexdigest()
@@ -183,14 +770,46 @@ class SpeechService(ABC):
         """
         raise NotImplementedError
 
+    async def agenerate_from_text(
+        self, text: str, cache_dir: str = None, path: str = None, **kwargs
+    ) -> dict:
+        """Asynchronous version of :meth:`generate_from_text`. Override this
+        method for services that have an asyncio client. The default
+        implementation runs :meth:`generate_from_text` in a worker thread.
+
+        Args:
+            text (str): The text to synthesize speech from.
+            cache_dir (str, optional): The output directory to save the audio file and data to. Defaults to None.
+            path (str, optional): The path to save the audio file to. Defaults to None.
+
+        Returns:
+            dict: Output data dictionary.
+        """
+
+        def generate() -> dict:
+            if self.thread_safe:
+                return self.generate_from_text(
+                    text, cache_dir=cache_dir, path=path, **kwargs
+                )
+            with self._generate_lock:
+                return self.generate_from_text(
+                    text, cache_dir=cache_dir, path=path, **kwargs
+                )
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, generate)
+
     def get_cached_result(self, input_data, cache_dir):
-        json_path = os.path.join(cache_dir / DEFAULT_VOICEOVER_CACHE_JSON_FILENAME)
-        if os.path.exists(json_path):
-            json_data = json.load(open(json_path, "r"))
-            for entry in json_data:
-                if entry["input_data"] == input_data:
-                    return entry
-        return None
+        """Looks up the cache entry for ``input_data`` in ``cache_dir``.
+
+        Args:
+            input_data (dict): The data that identifies the voiceover.
+            cache_dir (str): The cache directory to look in.
+
+        Returns:
+            dict: The cached output data dictionary, or None on a cache miss.
+        """
+        return get_voiceover_cache(cache_dir).get(input_data)
 
     def audio_callback(self, audio_path: str, data: dict, **kwargs):
         """Callback function for when the audio file is ready.
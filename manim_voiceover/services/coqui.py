@@ -18,6 +18,8 @@ class CoquiService(SpeechService):
     Default model: ``tts_models/en/ljspeech/tacotron2-DDC``.
     """
 
+    thread_safe = False
+
     def __init__(
         self,
         model_name: str = DEFAULT_MODEL,
@@ -1,3 +1,4 @@
+import json
 import os
 import sys
 from pathlib import Path
@@ -7,10 +8,16 @@ from dotenv import find_dotenv, load_dotenv
 from manim import logger
 
 from manim_voiceover.helper import create_dotenv_file, remove_bookmarks
-from manim_voiceover.services.base import SpeechService
+from manim_voiceover.services.base import (
+    RETRY_STATUS_CODES,
+    RetryableError,
+    SpeechService,
+)
 
 try:
+    import requests
     from elevenlabs import OutputFormat, Voice, VoiceSettings, generate, save, voices
+    from elevenlabs.api.error import APIError, RateLimitError
 except ImportError:
     logger.error(
         'Missing packages. Run `pip install "manim-voiceover[elevenlabs]"` '
@@ -20,6 +27,22 @@ except ImportError:
 
 load_dotenv(find_dotenv(usecwd=True))
 
+# Statuses that the ElevenLabs API reports when it is overloaded
+RETRY_STATUSES = ["too_many_concurrent_requests", "system_busy"]
+
+
+def is_transient_api_error(error: Exception) -> bool:
+    """Returns whether an error raised by the ElevenLabs SDK is worth retrying.
+    The SDK raises its own errors for HTTP errors, without the response."""
+    if isinstance(error, RateLimitError):
+        return True
+    if isinstance(error, APIError):
+        # The status is a name, or the HTTP status code for some errors
+        retry_statuses = RETRY_STATUSES + [str(code) for code in RETRY_STATUS_CODES]
+        return error.status in retry_statuses
+    # The SDK fails to parse the HTML error pages of gateways
+    return isinstance(error, json.JSONDecodeError)
+
 
 def create_dotenv_elevenlabs():
     logger.info(
@@ -173,13 +196,23 @@ class ElevenLabsService(SpeechService):
         else:
             audio_path = path
 
+        def request():
+            try:
+                return generate(
+                    text=input_text,
+                    voice=self.voice,
+                    model=self.model,
+                    output_format=self.output_format,
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                raise RetryableError(str(e)) from e
+            except Exception as e:
+                if is_transient_api_error(e):
+                    raise RetryableError(str(e)) from e
+                raise
+
         try:
-            audio = generate(
-                text=input_text,
-                voice=self.voice,
-                model=self.model,
-                output_format=self.output_format,
-            )
+            audio = self.rate_limiter.call(request)
             save(audio, str(Path(cache_dir) / audio_path))  # type: ignore
         except Exception as e:
             logger.error(e)
@@ -9,7 +9,11 @@ except ImportError:
         'Missing packages. Run `pip install "manim-voiceover[gtts]"` to use GTTSService.'
     )
 
-from manim_voiceover.services.base import SpeechService
+from manim_voiceover.services.base import (
+    RETRY_STATUS_CODES,
+    RetryableError,
+    SpeechService,
+)
 
 
 class GTTSService(SpeechService):
@@ -65,9 +69,18 @@ class GTTSService(SpeechService):
                 "See the documentation for more information."
             )
 
+        def save():
+            try:
+                tts.save(str(Path(cache_dir) / audio_path))
+            except gTTSError as e:
+                # No response means that the request did not go through
+                if e.rsp is None or e.rsp.status_code in RETRY_STATUS_CODES:
+                    raise RetryableError(str(e)) from e
+                raise
+
         try:
-            tts.save(str(Path(cache_dir) / audio_path))
-        except gTTSError as e:
+            self.rate_limiter.call(save)
+        except (gTTSError, RetryableError) as e:
             logger.error(e)
             raise Exception(
                 "gTTS gave an error. You are either not connected to the internet, or there is a problem with the Google Translate API."
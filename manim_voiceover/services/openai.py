@@ -1,5 +1,7 @@
+import asyncio
 import os
 import sys
+import weakref
 from pathlib import Path
 
 from dotenv import find_dotenv, load_dotenv
@@ -10,7 +12,7 @@ from manim_voiceover.helper import (
     prompt_ask_missing_extras,
     remove_bookmarks,
 )
-from manim_voiceover.services.base import SpeechService
+from manim_voiceover.services.base import RetryableError, SpeechService
 
 try:
     import openai
@@ -64,24 +66,26 @@ class OpenAIService(SpeechService):
         prompt_ask_missing_extras("openai", "openai", "OpenAIService")
         self.voice = voice
         self.model = model
+        # The connections of a client are bound to the event loop that
+        # opened them, so each loop gets its own client
+        self._async_clients = weakref.WeakKeyDictionary()
 
         SpeechService.__init__(self, transcription_model=transcription_model, **kwargs)
 
-    def generate_from_text(
-        self, text: str, cache_dir: str = None, path: str = None, **kwargs
-    ) -> dict:
-        """"""
-        if cache_dir is None:
-            cache_dir = self.cache_dir
+    def _get_async_client(self) -> "openai.AsyncOpenAI":
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            self._async_clients[loop] = openai.AsyncOpenAI()
+        return self._async_clients[loop]
 
+    def _get_input_data(self, text: str, **kwargs) -> dict:
         speed = kwargs.get("speed", 1.0)
 
         if not (0.25 <= speed <= 4.0):
             raise ValueError("The speed must be between 0.25 and 4.0.")
 
-        input_text = remove_bookmarks(text)
-        input_data = {
-            "input_text": input_text,
+        return {
+            "input_text": remove_bookmarks(text),
             "service": "openai",
             "config": {
                 "voice": self.voice,
@@ -90,6 +94,15 @@ class OpenAIService(SpeechService):
             },
         }
 
+    def generate_from_text(
+        self, text: str, cache_dir: str = None, path: str = None, **kwargs
+    ) -> dict:
+        """"""
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+
+        input_data = self._get_input_data(text, **kwargs)
+
         cached_result = self.get_cached_result(input_data, cache_dir)
         if cached_result is not None:
             return cached_result
@@ -102,12 +115,18 @@ class OpenAIService(SpeechService):
         if os.getenv("OPENAI_API_KEY") is None:
             create_dotenv_openai()
 
-        response = openai.audio.speech.create(
-            model=self.model,
-            voice=self.voice,
-            input=input_text,
-            speed=speed,
-        )
+        def request():
+            try:
+                return openai.audio.speech.create(
+                    model=self.model,
+                    voice=self.voice,
+                    input=input_data["input_text"],
+                    speed=input_data["config"]["speed"],
+                )
+            except openai.APIConnectionError as e:
+                raise RetryableError(str(e)) from e
+
+        response = self.rate_limiter.call(request)
         response.stream_to_file(str(Path(cache_dir) / audio_path))
 
         json_dict = {
@@ -117,3 +136,48 @@ class OpenAIService(SpeechService):
         }
 
         return json_dict
+
+    async def agenerate_from_text(
+        self, text: str, cache_dir: str = None, path: str = None, **kwargs
+    ) -> dict:
+        """"""
+        if cache_dir is None:
+            cache_dir = self.cache_dir
+
+        input_data = self._get_input_data(text, **kwargs)
+
+        cached_result = self.get_cached_result(input_data, cache_dir)
+        if cached_result is not None:
+            return cached_result
+
+        if path is None:
+            audio_path = self.get_audio_basename(input_data) + ".mp3"
+        else:
+            audio_path = path
+
+        if os.getenv("OPENAI_API_KEY") is None:
+            create_dotenv_openai()
+
+        client = self._get_async_client()
+
+        async def request():
+            try:
+                return await client.audio.speech.create(
+                    model=self.model,
+                    voice=self.voice,
+                    input=input_data["input_text"],
+                    speed=input_data["config"]["speed"],
+                )
+            except openai.APIConnectionError as e:
+                raise RetryableError(str(e)) from e
+
+        response = await self.rate_limiter.acall(request)
+        await response.astream_to_file(str(Path(cache_dir) / audio_path))
+
+        json_dict = {
+            "input_text": text,
+            "input_data": input_data,
+            "original_audio": audio_path,
+        }
+
+        return json_dict
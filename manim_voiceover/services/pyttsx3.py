@@ -15,6 +15,8 @@ from manim_voiceover.services.base import SpeechService
 class PyTTSX3Service(SpeechService):
     """Speech service class for pyttsx3."""
 
+    thread_safe = False
+
     def __init__(self, engine=None, **kwargs):
         """"""
         prompt_ask_missing_extras("pyttsx3", "pyttsx3", "PyTTSX3Service")
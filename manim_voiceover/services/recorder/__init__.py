@@ -20,6 +20,8 @@ except ImportError:
 class RecorderService(SpeechService):
     """Speech service that records from a microphone during rendering."""
 
+    thread_safe = False
+
     def __init__(
         self,
         format: int = DEFAULT_FORMAT,
@@ -1,16 +1,375 @@
 import os
 import json
-import itertools
+import math
+import multiprocessing
+import subprocess
+import tempfile
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pydub import AudioSegment
-from typing import Tuple, Iterable
+from pydub.exceptions import CouldntDecodeError
+from pydub.utils import db_to_float, mediainfo_json
+from typing import Tuple, Iterable, Iterator, List, Optional
 
 # from pydub.silence import split_on_silence
 
-from pydub.silence import detect_nonsilent
 import hashlib
 
+from manim_voiceover.helper import get_samples, sha256_file
 from manim_voiceover.services.base import SpeechService
 
+# Sample width of the PCM that recordings are decoded to
+PCM_SAMPLE_WIDTH = 2
+
+# Default maximum number of processes that export segments
+DEFAULT_EXPORT_WORKERS = 4
+
+
+def get_frame_index(ms, frame_rate: int) -> np.ndarray:
+    """Returns the frame at which pydub starts slicing at `ms`"""
+    return (np.asarray(ms) * (frame_rate / 1000.0)).astype(np.int64)
+
+
+def get_energy_envelope(
+    blocks: Iterable[np.ndarray],
+    frame_rate: int,
+    channels: int,
+    step: int,
+    tail_duration: int = 0,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Returns the sum of the squared samples in each `step` ms cell of an audio
+    stream, the energies of the frames in its last tail_duration ms, and the
+    number of frames in the stream
+
+    blocks - interleaved samples, in blocks of whole frames. Only one block
+        is held in memory at a time, the envelope is much smaller than the
+        audio
+
+    frame_rate - frames per second
+
+    channels - number of channels
+
+    step - cell length in ms
+
+    tail_duration - (in ms) length of the tail. default: 0ms
+    """
+    tail_frames = int(get_frame_index(tail_duration, frame_rate))
+    sums = []
+    tail = np.zeros(0)
+    n_frames = 0
+    cell = 0
+    cell_sum = 0.0
+    for block in blocks:
+        frame_energy = (block.astype(np.float64) ** 2).reshape(-1, channels).sum(axis=1)
+        f0 = n_frames
+        f1 = f0 + len(frame_energy)
+        cumsum = np.concatenate([[0.0], np.cumsum(frame_energy)])
+        if tail_frames:
+            tail = np.concatenate([tail, frame_energy])[-tail_frames:]
+
+        # Cell k ends at the frame where pydub would start slicing k + 1
+        last_cell = int(f1 * 1000 / (step * frame_rate)) + 2
+        ends = get_frame_index(np.arange(cell + 1, last_cell + 1) * step, frame_rate)
+        ends = ends[ends <= f1] - f0
+        if len(ends):
+            edges = np.concatenate([[0], ends])
+            block_sums = cumsum[edges[1:]] - cumsum[edges[:-1]]
+            block_sums[0] += cell_sum
+            sums.append(block_sums)
+            cell += len(ends)
+            cell_sum = cumsum[-1] - cumsum[ends[-1]]
+        else:
+            cell_sum += cumsum[-1]
+        n_frames = f1
+
+    sums.append(np.array([cell_sum]))
+    return np.concatenate(sums), tail, n_frames
+
+
+def get_nonsilent_ranges(
+    blocks: Iterable[np.ndarray],
+    frame_rate: int,
+    channels: int,
+    sample_width: int,
+    min_silence_len: int = 1000,
+    silence_thresh: int = -16,
+    keep_silence: Tuple[int, int] = (100, 1000),
+    seek_step: int = 10,
+    hysteresis: float = 0.0,
+) -> List[List[int]]:
+    """
+    Returns the [start, end] ranges in ms of the nonsilent sections of an
+    audio stream, with silence kept around them. See
+    `split_on_silence_modified` for the arguments.
+
+    A window of min_silence_len ms at every seek_step ms is silent if its RMS
+    is at most silence_thresh, like pydub's `detect_silence`. The RMS of all
+    windows is computed at once from an energy envelope of the stream.
+    """
+    step = math.gcd(seek_step, min_silence_len)
+    # The last window may start between cells, it is measured on the tail
+    sums, tail, n_frames = get_energy_envelope(
+        blocks, frame_rate, channels, step, tail_duration=min_silence_len + 3
+    )
+    seg_len = round(1000 * n_frames / frame_rate)
+    max_amplitude = float(1 << (8 * sample_width - 1))
+
+    if isinstance(keep_silence, bool):
+        keep_silence_begin = seg_len if keep_silence else 0
+        keep_silence_end = keep_silence_begin
+    elif isinstance(keep_silence, float) or isinstance(keep_silence, int):
+        keep_silence_begin = keep_silence
+        keep_silence_end = keep_silence
+    elif isinstance(keep_silence, list) or isinstance(keep_silence, tuple):
+        assert len(keep_silence) == 2
+        keep_silence_begin = keep_silence[0]
+        keep_silence_end = keep_silence[1]
+
+    # you can't have a silent portion of a sound that is longer than the sound
+    silence_starts = np.zeros(0, dtype=np.int64)
+    if seg_len >= min_silence_len:
+        last_slice_start = seg_len - min_silence_len
+        starts = np.arange(0, last_slice_start + 1, seek_step)
+        # make sure the last portion of the audio is searched
+        if last_slice_start % seek_step:
+            starts = np.append(starts, last_slice_start)
+
+        cum_sums = np.concatenate([[0.0], np.cumsum(sums)])
+        lo = np.minimum(starts // step, len(sums))
+        hi = np.minimum(lo + min_silence_len // step, len(sums))
+        window_sums = cum_sums[hi] - cum_sums[lo]
+        if last_slice_start % step:
+            start, end = (
+                get_frame_index([last_slice_start, seg_len], frame_rate) - n_frames
+            )
+            window_sums[-1] = tail[len(tail) + start : len(tail) + min(end, 0)].sum()
+
+        # Like pydub, count the frames that slicing pads with silence
+        window_counts = (
+            get_frame_index(starts + min_silence_len, frame_rate)
+            - get_frame_index(starts, frame_rate)
+        ) * channels
+        rms = np.floor(np.sqrt(window_sums / np.maximum(window_counts, 1)))
+
+        silent = rms <= db_to_float(silence_thresh) * max_amplitude
+        if hysteresis:
+            # Silence only ends once the level rises above the upper
+            # threshold, levels in between keep the previous state
+            loud = rms > db_to_float(silence_thresh + hysteresis) * max_amplitude
+            state = np.where(silent, 1, np.where(loud, 0, -1))
+            known = np.where(state >= 0, np.arange(len(state)), 0)
+            state = state[np.maximum.accumulate(known)]
+            silent = state == 1
+        silence_starts = starts[silent]
+
+    # if there is no silence, the whole thing is nonsilent
+    if not len(silence_starts):
+        nonsilent_ranges = [[0, seg_len]]
+    else:
+        # combine the silent windows into ranges, overlapping windows
+        # are combined as well
+        prev = silence_starts[:-1]
+        current = silence_starts[1:]
+        breaks = (current != prev + seek_step) & (current > prev + min_silence_len)
+        silent_starts = np.concatenate([silence_starts[:1], current[breaks]])
+        silent_ends = (
+            np.concatenate([prev[breaks], silence_starts[-1:]]) + min_silence_len
+        )
+
+        nonsilent_ranges = [
+            [int(start), int(end)]
+            for start, end in zip(
+                np.concatenate([[0], silent_ends]),
+                np.concatenate([silent_starts, [seg_len]]),
+            )
+        ]
+        if nonsilent_ranges[-1][0] == seg_len:
+            nonsilent_ranges.pop()
+        if nonsilent_ranges and nonsilent_ranges[0] == [0, 0]:
+            nonsilent_ranges.pop(0)
+
+    output_ranges = [
+        [start - keep_silence_begin, end + keep_silence_end]
+        for (start, end) in nonsilent_ranges
+    ]
+
+    for range_i, range_ii in zip(output_ranges, output_ranges[1:]):
+        last_end = range_i[1]
+        next_start = range_ii[0]
+        if next_start < last_end:
+            range_i[1] = (last_end + next_start) // 2
+            range_ii[0] = range_i[1]
+
+    return [[max(start, 0), min(end, seg_len)] for start, end in output_ranges]
+
+
+def iter_sample_blocks(
+    audio_segment: AudioSegment, block_duration: int = 60000
+) -> Iterator[np.ndarray]:
+    """Yields the samples of audio_segment in blocks of block_duration ms,
+    as views of its raw data"""
+    samples = get_samples(audio_segment)
+    frames = max(int(audio_segment.frame_count(ms=block_duration)), 1)
+    block_len = frames * audio_segment.channels
+    for i in range(0, len(samples), block_len):
+        yield samples[i : i + block_len]
+
+
+def get_audio_info(path: str) -> Tuple[int, int]:
+    """Returns the frame rate and the number of channels of the first audio
+    stream of a file, without decoding it"""
+    info = mediainfo_json(path)
+    for stream in info["streams"]:
+        if stream.get("codec_type") == "audio":
+            return int(stream["sample_rate"]), int(stream["channels"])
+    raise CouldntDecodeError(f"No audio stream found in {path}")
+
+
+def iter_pcm_blocks(
+    path: str, frame_rate: int, channels: int, block_duration: int = 60000
+) -> Iterator[np.ndarray]:
+    """
+    Decodes an audio file with a single ffmpeg process and yields its
+    interleaved 16-bit samples in blocks of block_duration ms
+
+    path - path to the audio file
+
+    frame_rate - frame rate to decode to
+
+    channels - number of channels to decode to
+
+    block_duration - (in ms) length of the blocks. default: 60000ms
+    """
+    command = [
+        AudioSegment.converter,
+        "-v",
+        "error",
+        "-i",
+        path,
+        "-f",
+        "s16le",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(frame_rate),
+        "-ac",
+        str(channels),
+        "-",
+    ]
+    frame_size = PCM_SAMPLE_WIDTH * channels
+    block_size = max(block_duration * frame_rate // 1000, 1) * frame_size
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.Popen(
+            command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr
+        )
+        try:
+            while True:
+                data = process.stdout.read(block_size)
+                data = data[: len(data) - len(data) % frame_size]
+                if not data:
+                    break
+                yield np.frombuffer(data, dtype=np.int16)
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                # The consumer stopped early
+                process.kill()
+            process.wait()
+
+        if process.returncode != 0:
+            stderr.seek(0)
+            raise CouldntDecodeError(
+                f"Decoding failed. ffmpeg returned error code: {process.returncode}"
+                f"\n\nOutput from ffmpeg/avlib:\n\n{stderr.read().decode(errors='replace')}"
+            )
+
+
+def iter_ranges(
+    blocks: Iterable[np.ndarray],
+    frame_rate: int,
+    channels: int,
+    ranges: List[List[int]],
+) -> Iterator[bytes]:
+    """
+    Yields the raw data of each [start, end] range in ms of an audio stream,
+    as soon as the range has been read
+
+    blocks - interleaved samples, in blocks of whole frames
+
+    frame_rate - frames per second
+
+    channels - number of channels
+
+    ranges - sorted, non-overlapping ranges, e.g. from `get_nonsilent_ranges`
+    """
+    # Frames at which the ranges start and end, like pydub would slice them
+    bounds = [
+        (int(get_frame_index(start, frame_rate)), int(get_frame_index(end, frame_rate)))
+        for start, end in ranges
+    ]
+    i = 0
+    parts = []
+    position = 0
+    for block in blocks:
+        block_end = position + len(block) // channels
+        while i < len(bounds):
+            start, end = bounds[i]
+            lo = max(start, position)
+            hi = min(end, block_end)
+            if hi > lo:
+                parts.append(
+                    block[
+                        (lo - position) * channels : (hi - position) * channels
+                    ].tobytes()
+                )
+            if end > block_end:
+                break
+            yield b"".join(parts)
+            parts = []
+            i += 1
+        position = block_end
+
+    # Ranges that end after the stream, due to rounding
+    for _ in bounds[i:]:
+        yield b"".join(parts)
+        parts = []
+
+
+def get_segment_path(data: bytes, cache_dir: str) -> str:
+    """Returns the path of the mp3 file in cache_dir that a segment with the
+    raw data `data` is exported to, named after its sha256"""
+    return os.path.join(cache_dir, hashlib.sha256(data).hexdigest() + ".mp3")
+
+
+def export_segment(
+    data: bytes, frame_rate: int, channels: int, output_path: str
+) -> str:
+    """
+    Exports the raw 16-bit data of a segment to an mp3 file at output_path,
+    and returns the path
+    """
+    # silence_chunk = AudioSegment.silent(duration=800)
+    # audio_chunk = chunk + silence_chunk
+    # normalized_chunk = match_target_amplitude(audio_chunk, -20.0)
+    audio_chunk = AudioSegment(
+        data=data,
+        sample_width=PCM_SAMPLE_WIDTH,
+        frame_rate=frame_rate,
+        channels=channels,
+    )
+    # Export the audio chunk with new bitrate. Write to a temporary file
+    # first, so that an interrupted export is not mistaken for a cached one
+    tmp_path = f"{os.path.splitext(output_path)[0]}.{os.getpid()}.tmp.mp3"
+    audio_chunk.export(
+        tmp_path,
+        bitrate="256k",
+        format="mp3",
+    )
+    os.replace(tmp_path, output_path)
+    return output_path
+
 
 # Had to modify `split_on_silence` from pydub to allow for
 # keeping different durations of silence at chunk beginnings and ends
@@ -20,6 +379,7 @@ def split_on_silence_modified(
     silence_thresh: int = -16,
     keep_silence: Tuple[int, int] = (100, 1000),
     seek_step: int = 10,
+    hysteresis: float = 0.0,
     **kwargs,
 ):
     """
@@ -43,50 +403,31 @@ def split_on_silence_modified(
         default: 100ms
 
     seek_step - step size for interating over the segment in ms
-    """
-
-    # from the itertools documentation
-    def pairwise(iterable: Iterable) -> zip:
-        "s -> (s0,s1), (s1,s2), (s2, s3), ..."
-        a, b = itertools.tee(iterable)
-        next(b, None)
-        return zip(a, b)
 
-    if isinstance(keep_silence, bool):
-        keep_silence_begin = len(audio_segment) if keep_silence else 0
-        keep_silence_end = keep_silence_begin
-    elif isinstance(keep_silence, float) or isinstance(keep_silence, int):
-        keep_silence_begin = keep_silence
-        keep_silence_end = keep_silence
-    elif isinstance(keep_silence, list) or isinstance(keep_silence, tuple):
-        assert len(keep_silence) == 2
-        keep_silence_begin = keep_silence[0]
-        keep_silence_end = keep_silence[1]
-
-    output_ranges = [
-        [start - keep_silence_begin, end + keep_silence_end]
-        for (start, end) in detect_nonsilent(
-            audio_segment, min_silence_len, silence_thresh, seek_step
-        )
-    ]
-
-    for range_i, range_ii in pairwise(output_ranges):
-        last_end = range_i[1]
-        next_start = range_ii[0]
-        if next_start < last_end:
-            range_i[1] = (last_end + next_start) // 2
-            range_ii[0] = range_i[1]
-
-    return [
-        audio_segment[max(start, 0) : min(end, len(audio_segment))]
-        for start, end in output_ranges
-    ]
+    hysteresis - (in dB) once silent, audio only counts as sound again when
+        it is louder than silence_thresh + hysteresis. Keeps breaths and
+        noise from splitting a silence. default: 0dB
+    """
+    output_ranges = get_nonsilent_ranges(
+        iter_sample_blocks(audio_segment),
+        audio_segment.frame_rate,
+        audio_segment.channels,
+        audio_segment.sample_width,
+        min_silence_len=min_silence_len,
+        silence_thresh=silence_thresh,
+        keep_silence=keep_silence,
+        seek_step=seek_step,
+        hysteresis=hysteresis,
+    )
+    return [audio_segment[start:end] for start, end in output_ranges]
 
 
 # Disable this for now
 class _StitcherService(SpeechService):
     """Speech service for stitching audio recordings back onto a Manim scene"""
 
+    thread_safe = False
+
     def __init__(
         self,
         source_path: str,
@@ -94,6 +435,8 @@ class _StitcherService(SpeechService):
         silence_thresh: int = -45,
         seek_step: int = 10,
         keep_silence: Tuple[int, int] = (100, 1000),
+        hysteresis: float = 0.0,
+        export_workers: Optional[int] = None,
         **kwargs,
     ):
         self.params = {
@@ -102,20 +445,29 @@ class _StitcherService(SpeechService):
             "silence_thresh": silence_thresh,
             "seek_step": seek_step,
             "keep_silence": keep_silence,
+            "hysteresis": hysteresis,
         }
+        # Number of processes that export segments, defaults to
+        # DEFAULT_EXPORT_WORKERS
+        self.export_workers = export_workers
 
         SpeechService.__init__(self, **kwargs)
         self.process_audio()
         self.current_segment_index = 0
 
     def process_audio(self) -> None:
-        segment = AudioSegment.from_file(self.params["source_path"])
+        source_path = self.params["source_path"]
+        # Hash the file instead of decoding it, so that a processed
+        # recording is not read into memory again
+        source_hash = sha256_file(source_path)
 
         # Check whether the audio file has already been processed
         if os.path.exists(self.get_json_path()):
             config = json.load(open(self.get_json_path(), "r"))
             try:
-                if self.params == config["params"]:
+                # Round trip the params, keep_silence is a list in JSON
+                params = json.loads(json.dumps(self.params))
+                if params == config["params"] and source_hash == config["source_hash"]:
                     all_files_exist = True
                     for segment in config["segments"]:
                         if not os.path.exists(segment["path"]):
@@ -127,26 +479,66 @@ class _StitcherService(SpeechService):
             except KeyError:
                 pass
 
-        chunks = split_on_silence_modified(segment, **self.params)
+        # Stream the recording twice, once to find the segments and once to
+        # export them, so that only one block is in memory at a time
+        frame_rate, channels = get_audio_info(source_path)
+        output_ranges = get_nonsilent_ranges(
+            iter_pcm_blocks(source_path, frame_rate, channels),
+            frame_rate,
+            channels,
+            PCM_SAMPLE_WIDTH,
+            min_silence_len=self.params["min_silence_len"],
+            silence_thresh=self.params["silence_thresh"],
+            keep_silence=self.params["keep_silence"],
+            seek_step=self.params["seek_step"],
+            hysteresis=self.params["hysteresis"],
+        )
+        chunks = iter_ranges(
+            iter_pcm_blocks(source_path, frame_rate, channels),
+            frame_rate,
+            channels,
+            output_ranges,
+        )
 
         output_dict = {
             "params": self.params,
+            "source_hash": source_hash,
             "segments": [],
         }
-        for i, chunk in enumerate(chunks):
-            # silence_chunk = AudioSegment.silent(duration=800)
-            # audio_chunk = chunk + silence_chunk
-            audio_chunk = chunk
-            # normalized_chunk = match_target_amplitude(audio_chunk, -20.0)
-            data_hash = hashlib.sha256(audio_chunk.raw_data).hexdigest()
-
-            # Export the audio chunk with new bitrate.
-            output_path = os.path.join(self.cache_dir, data_hash + ".mp3")
-            audio_chunk.export(
-                output_path,
-                bitrate="256k",
-                format="mp3",
-            )
+        max_workers = max(
+            1, min(self.export_workers or DEFAULT_EXPORT_WORKERS, os.cpu_count() or 1)
+        )
+        # The pool is only started once a segment has to be exported, each
+        # worker imports manim
+        executor = None
+        futures = deque()
+        paths = []
+        try:
+            for chunk in chunks:
+                output_path = get_segment_path(chunk, self.cache_dir)
+                if os.path.exists(output_path):
+                    paths.append(output_path)
+                    continue
+
+                if executor is None:
+                    executor = ProcessPoolExecutor(
+                        max_workers=max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                future = executor.submit(
+                    export_segment, chunk, frame_rate, channels, output_path
+                )
+                paths.append(future)
+                futures.append(future)
+                # Bound the number of segments waiting in memory
+                if len(futures) >= 2 * max_workers:
+                    futures.popleft().result()
+            paths = [path if isinstance(path, str) else path.result() for path in paths]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        for i, output_path in enumerate(paths):
             output_dict["segments"].append({"index": i, "path": output_path})
 
         # Save output info
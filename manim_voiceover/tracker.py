@@ -3,8 +3,7 @@ import re
 import numpy as np
 from manim import logger
 
-from typing import Optional, List
-from scipy.interpolate import interp1d
+from typing import Optional, List, Union
 
 from manim import Scene
 from manim_voiceover.modify_audio import get_duration
@@ -15,22 +14,194 @@ AUDIO_OFFSET_RESOLUTION = 10_000_000
 
 class TimeInterpolator:
     def __init__(self, word_boundaries: List[dict]):
-        self.x = []
-        self.y = []
-        for wb in word_boundaries:
-            self.x.append(wb["text_offset"])
-            self.y.append(wb["audio_offset"] / AUDIO_OFFSET_RESOLUTION)
-
-        self.f = interp1d(self.x, self.y)
-
-    def interpolate(self, distance: int) -> np.ndarray:
-        try:
-            return self.f(distance)
-        except:
+        x = np.array([wb["text_offset"] for wb in word_boundaries], dtype=float)
+        y = np.array(
+            [wb["audio_offset"] / AUDIO_OFFSET_RESOLUTION for wb in word_boundaries],
+            dtype=float,
+        )
+        # np.interp needs increasing text offsets
+        order = np.argsort(x, kind="stable")
+        self.x = x[order]
+        self.y = y[order]
+
+    def interpolate(self, distance: Union[int, np.ndarray]) -> np.ndarray:
+        """Returns the audio time in seconds at one or more text offsets.
+        Offsets outside of the word boundaries are clamped to the first or
+        last word boundary."""
+        distance = np.asarray(distance, dtype=float)
+        if np.any((distance < self.x[0]) | (distance > self.x[-1])):
             logger.warning(
                 "TimeInterpolator received weird input, there may be something wrong with the word boundaries."
             )
-            return self.y[-1]
+        return np.interp(distance, self.x, self.y)
+
+
+class WordIndex:
+    """Word-level timing of a voiceover, backed by NumPy arrays. Queries
+    are binary searches, so they stay fast for voiceovers with thousands of
+    words.
+
+    Times are in seconds, relative to the start of the voiceover. Text
+    offsets refer to the text of the voiceover without bookmarks.
+    """
+
+    def __init__(
+        self, word_boundaries: List[dict], duration: float, text_scale: float = 1.0
+    ):
+        """
+        Args:
+            word_boundaries (List[dict]): The word boundaries of the voiceover.
+            duration (float): The duration of the voiceover in seconds, which
+                is where the last word ends.
+            text_scale (float, optional): The factor that maps the text offsets
+                of the word boundaries to the text of the voiceover, e.g. if
+                they refer to a transcription of different length. Defaults
+                to 1.0.
+        """
+        word_boundaries = sorted(word_boundaries, key=lambda wb: wb["audio_offset"])
+        self.words = [wb["text"] for wb in word_boundaries]
+        self.start_times = (
+            np.array([wb["audio_offset"] for wb in word_boundaries], dtype=float)
+            / AUDIO_OFFSET_RESOLUTION
+        )
+        # A word ends where the next one starts
+        self.end_times = np.append(self.start_times[1:], max(duration, 0.0))
+        self.text_offsets = (
+            np.array([wb["text_offset"] for wb in word_boundaries], dtype=float)
+            * text_scale
+        )
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def time_of_word(self, index: int) -> float:
+        """Returns the time at which a word starts.
+
+        Args:
+            index (int): The index of the word, negative indices count from
+                the end.
+        """
+        return float(self.start_times[index])
+
+    def word_at_char(self, offset: int) -> int:
+        """Returns the index of the word at a text offset, i.e. of the last
+        word that starts at or before it."""
+        index = np.searchsorted(self.text_offsets, offset, side="right") - 1
+        return int(min(max(index, 0), len(self) - 1))
+
+    def time_at_char(self, offset: int) -> float:
+        """Returns the time at which the word at a text offset starts."""
+        return self.time_of_word(self.word_at_char(offset))
+
+    def word_at_time(self, time: float) -> int:
+        """Returns the index of the word being spoken at a time."""
+        index = np.searchsorted(self.start_times, time, side="right") - 1
+        return int(min(max(index, 0), len(self) - 1))
+
+    def words_between(self, t0: float, t1: float) -> np.ndarray:
+        """Returns the indices of the words that start at or after ``t0`` and
+        before ``t1``."""
+        start = np.searchsorted(self.start_times, t0, side="left")
+        end = np.searchsorted(self.start_times, t1, side="left")
+        return np.arange(start, end)
+
+
+def get_fallback_word_boundaries(input_text: str, duration: float) -> List[dict]:
+    """
+    Returns dummy word boundaries assuming a linear mapping between
+    text and audio. Used when word boundaries are not available.
+    """
+    net_text = remove_bookmarks(input_text)
+    return [
+        {
+            "audio_offset": 0,
+            "text_offset": 0,
+            "word_length": len(net_text),
+            "text": input_text,
+            "boundary_type": "Word",
+        },
+        {
+            "audio_offset": duration * AUDIO_OFFSET_RESOLUTION,
+            "text_offset": len(net_text),
+            "word_length": 1,
+            "text": ".",
+            "boundary_type": "Word",
+        },
+    ]
+
+
+def get_word_boundaries(data: dict, duration: float) -> List[dict]:
+    word_boundaries = data["word_boundaries"]
+    if not word_boundaries or len(word_boundaries) < 2:
+        logger.warning(
+            f"Word boundaries for voiceover {data['input_text']} are not "
+            "available or are insufficient. Using fallback word boundaries."
+        )
+        word_boundaries = get_fallback_word_boundaries(data["input_text"], duration)
+    return word_boundaries
+
+
+def compute_voiceover_timing(data: dict, duration: float) -> dict:
+    """Computes what a :class:`VoiceoverTracker` needs from an output data
+    dictionary: the text without bookmarks and the times of the bookmarks in
+    seconds, relative to the start of the voiceover. Speech services store
+    the result in the cache entry under ``timing``.
+
+    Args:
+        data (dict): The output data dictionary of a speech service.
+        duration (float): The duration of the final audio in seconds.
+
+    Returns:
+        dict: The timing. Bookmark times are only included if the data has
+        word boundaries.
+    """
+    input_text = data["input_text"]
+    timing = {"input_text": input_text, "duration": duration}
+
+    content = ""
+    bookmark_distances = {}
+    # Mark bookmark distances
+    # parts = re.split("(<bookmark .*/>)", input_text)
+    parts = re.split(r"(<bookmark\s*mark\s*=[\'\"]\w*[\"\']\s*/>)", input_text)
+    for p in parts:
+        matched = re.match(r"<bookmark\s*mark\s*=[\'\"](.*)[\"\']\s*/>", p)
+        if matched:
+            bookmark_distances[matched.group(1)] = len(content)
+        else:
+            content += p
+    timing["content"] = content
+    timing["bookmark_distances"] = bookmark_distances
+
+    if "word_boundaries" not in data:
+        return timing
+
+    net_text_len = len(content)
+    if "transcribed_text" in data:
+        transcribed_text_len = len(data["transcribed_text"].strip())
+    else:
+        transcribed_text_len = net_text_len
+
+    # Exact bookmark offsets reported by the speech service, if any
+    bookmark_offsets = data.get("bookmarks", {})
+
+    # Normalize text offsets, and interpolate all of them at once
+    marks = list(bookmark_distances)
+    if marks:
+        time_interpolator = TimeInterpolator(get_word_boundaries(data, duration))
+        elapsed = time_interpolator.interpolate(
+            np.array([bookmark_distances[mark] for mark in marks])
+            * transcribed_text_len
+            / net_text_len
+        )
+
+    bookmark_times = {}
+    for idx, mark in enumerate(marks):
+        if mark in bookmark_offsets:
+            bookmark_times[mark] = bookmark_offsets[mark] / AUDIO_OFFSET_RESOLUTION
+        else:
+            bookmark_times[mark] = float(elapsed[idx])
+    timing["bookmark_times"] = bookmark_times
+    return timing
 
 
 class VoiceoverTracker:
@@ -46,7 +217,18 @@ class VoiceoverTracker:
         self.scene = scene
         self.data = data
         self.cache_dir = cache_dir
-        self.duration = get_duration(Path(cache_dir) / self.data["final_audio"])
+
+        # Use the timing stored in the cache entry, unless it was computed
+        # for a text with bookmarks at other positions
+        timing = self.data.get("timing")
+        if timing is None or timing["input_text"] != self.data["input_text"]:
+            if timing is not None:
+                duration = timing["duration"]
+            else:
+                duration = get_duration(Path(cache_dir) / self.data["final_audio"])
+            timing = compute_voiceover_timing(self.data, duration)
+
+        self.duration = timing["duration"]
         # last_t = scene.last_t
         last_t = scene.renderer.time
         if last_t is None:
@@ -54,71 +236,48 @@ class VoiceoverTracker:
         self.start_t = last_t
         self.end_t = last_t + self.duration
 
-        if "word_boundaries" in self.data:
-            self._process_bookmarks()
+        if "bookmark_times" in timing:
+            self._process_bookmarks(timing)
 
-    def _get_fallback_word_boundaries(self):
-        """
-        Returns dummy word boundaries assuming a linear mapping between
-        text and audio. Used when word boundaries are not available.
-        """
-        input_text = remove_bookmarks(self.data["input_text"])
-        return [
-            {
-                "audio_offset": 0,
-                "text_offset": 0,
-                "word_length": len(input_text),
-                "text": self.data["input_text"],
-                "boundary_type": "Word",
-            },
-            {
-                "audio_offset": self.duration * AUDIO_OFFSET_RESOLUTION,
-                "text_offset": len(input_text),
-                "word_length": 1,
-                "text": ".",
-                "boundary_type": "Word",
-            },
-        ]
-
-    def _process_bookmarks(self) -> None:
-        self.bookmark_times = {}
-        self.bookmark_distances = {}
-
-        word_boundaries = self.data["word_boundaries"]
-        if not word_boundaries or len(word_boundaries) < 2:
-            logger.warning(
-                f"Word boundaries for voiceover {self.data['input_text']} are not "
-                "available or are insufficient. Using fallback word boundaries."
+    @property
+    def time_interpolator(self) -> TimeInterpolator:
+        if not hasattr(self, "_time_interpolator"):
+            self._time_interpolator = TimeInterpolator(
+                get_word_boundaries(self.data, self.duration)
             )
-            word_boundaries = self._get_fallback_word_boundaries()
+        return self._time_interpolator
 
-        self.time_interpolator = TimeInterpolator(word_boundaries)
+    @property
+    def word_index(self) -> WordIndex:
+        """The :class:`WordIndex` of the voiceover, for timing animations to
+        individual words without bookmarks."""
+        self._check_bookmarks()
+        if not hasattr(self, "_word_index"):
+            net_text_len = len(self.content)
+            if "transcribed_text" in self.data:
+                text_scale = net_text_len / max(
+                    len(self.data["transcribed_text"].strip()), 1
+                )
+            else:
+                text_scale = 1.0
+            self._word_index = WordIndex(
+                get_word_boundaries(self.data, self.duration),
+                self.duration,
+                text_scale=text_scale,
+            )
+        return self._word_index
 
-        net_text_len = len(remove_bookmarks(self.data["input_text"]))
-        if "transcribed_text" in self.data:
-            transcribed_text_len = len(self.data["transcribed_text"].strip())
-        else:
-            transcribed_text_len = net_text_len
+    def _get_fallback_word_boundaries(self):
+        return get_fallback_word_boundaries(self.data["input_text"], self.duration)
 
+    def _process_bookmarks(self, timing: dict) -> None:
         self.input_text = self.data["input_text"]
-        self.content = ""
-
-        # Mark bookmark distances
-        # parts = re.split("(<bookmark .*/>)", self.input_text)
-        parts = re.split(r"(<bookmark\s*mark\s*=[\'\"]\w*[\"\']\s*/>)", self.input_text)
-        for p in parts:
-            matched = re.match(r"<bookmark\s*mark\s*=[\'\"](.*)[\"\']\s*/>", p)
-            if matched:
-                self.bookmark_distances[matched.group(1)] = len(self.content)
-            else:
-                self.content += p
-
-        for mark, dist in self.bookmark_distances.items():
-            # Normalize text offset
-            elapsed = self.time_interpolator.interpolate(
-                dist * transcribed_text_len / net_text_len
-            )
-            self.bookmark_times[mark] = self.start_t + elapsed
+        self.content = timing["content"]
+        self.bookmark_distances = timing["bookmark_distances"]
+        self.bookmark_times = {
+            mark: self.start_t + elapsed
+            for mark, elapsed in timing["bookmark_times"].items()
+        }
 
     def get_remaining_duration(self, buff: float = 0.0) -> float:
         """Returns the remaining duration of the voiceover.
@@ -165,3 +324,22 @@ class VoiceoverTracker:
         if limit is not None:
             result = min(limit, result)
         return result
+
+    def time_until_word(
+        self, index: int, buff: int = 0, limit: Optional[int] = None
+    ) -> int:
+        """Returns the time until a word is spoken.
+
+        Args:
+            index (int): The index of the word in :attr:`word_index`.
+            buff (int, optional): A buffer to add to the remaining duration, in seconds. Defaults to 0.
+            limit (Optional[int], optional): A maximum value to return. Defaults to None.
+
+        Returns:
+            int:
+        """
+        word_t = self.start_t + self.word_index.time_of_word(index)
+        result = max(word_t - self.scene.renderer.time + buff, 0)
+        if limit is not None:
+            result = min(limit, result)
+        return result
@@ -0,0 +1,483 @@
+import gc
+import importlib.util
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import typing as t
+from abc import ABC, abstractmethod
+
+from manim import logger
+
+from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
+
+
+def timestamps_to_word_boundaries(segments):
+    word_boundaries = []
+    current_text_offset = 0
+    for segment in segments:
+        for dict_ in segment["words"]:
+            word = dict_["word"]
+            word_boundaries.append(
+                {
+                    "audio_offset": int(dict_["start"] * AUDIO_OFFSET_RESOLUTION),
+                    # "duration_milliseconds": 0,
+                    "text_offset": current_text_offset,
+                    "word_length": len(word),
+                    "text": word,
+                    "boundary_type": "Word",
+                }
+            )
+            current_text_offset += len(word)
+            # If word is not punctuation, add a space
+            # if word not in [".", ",", "!", "?", ";", ":", "(", ")"]:
+            # current_text_offset += 1
+
+    return word_boundaries
+
+
+def aligned_timestamps_to_word_boundaries(segments, text: str):
+    """Like :func:`timestamps_to_word_boundaries`, for timestamps from aligning
+    ``text`` to the audio. The text offsets are the positions of the words in
+    ``text`` itself."""
+    word_boundaries = []
+    current_text_offset = 0
+    for segment in segments:
+        for dict_ in segment["words"]:
+            word = dict_["word"].strip()
+            text_offset = text.find(word, current_text_offset)
+            if not word or text_offset == -1:
+                continue
+            word_boundaries.append(
+                {
+                    "audio_offset": int(dict_["start"] * AUDIO_OFFSET_RESOLUTION),
+                    "text_offset": text_offset,
+                    "word_length": len(word),
+                    "text": word,
+                    "boundary_type": "Word",
+                }
+            )
+            current_text_offset = text_offset + len(word)
+
+    return word_boundaries
+
+
+ModelKey = t.Tuple[str, str, t.Optional[str], tuple]
+
+# Loaded models, the number of handles that use them, and the locks that
+# serialize inference on them
+_models: t.Dict[ModelKey, t.Any] = {}
+_ref_counts: t.Dict[ModelKey, int] = {}
+_inference_locks: t.Dict[ModelKey, threading.Lock] = {}
+_models_lock = threading.Lock()
+
+
+def _load_model(key: ModelKey):
+    with _models_lock:
+        if key not in _models:
+            backend, name, device, options = key
+            logger.info(f"Loading transcription model {name} with {backend}")
+            _models[key] = BACKENDS[backend].load_model(name, device, **dict(options))
+        return _models[key]
+
+
+class WhisperModelHandle:
+    """A reference to a Whisper model in the process-wide registry.
+
+    Handles for the same backend, model name, device and options share one
+    copy of the weights. The model is loaded on first access of
+    :attr:`model`, and is loaded again if it has been freed with
+    :func:`unload` in between.
+
+    Handles that share a model also share :attr:`lock`, which must be held
+    while the model runs, as models are not safe to use from several threads
+    at once.
+    """
+
+    def __init__(self, key: ModelKey, lock: threading.Lock):
+        self.key = key
+        self.lock = lock
+        self.released = False
+
+    @property
+    def model(self):
+        if self.released:
+            raise ValueError("The model handle has been released")
+        return _load_model(self.key)
+
+    def release(self) -> None:
+        """Gives up the handle. The model is freed once no handle uses it."""
+        with _models_lock:
+            if self.released:
+                return
+            self.released = True
+            _ref_counts[self.key] -= 1
+            if _ref_counts[self.key] > 0:
+                return
+            del _ref_counts[self.key]
+            del _inference_locks[self.key]
+            model = _models.pop(self.key, None)
+        if model is not None:
+            del model
+            _free_memory()
+
+
+def get_whisper_model(
+    name: str, device: t.Optional[str] = None, backend: str = "stable-ts", **options
+) -> WhisperModelHandle:
+    """Returns a handle to a Whisper model, shared with every other user of
+    the same model in this process. The model itself is not loaded until the
+    handle's :attr:`~WhisperModelHandle.model` is first accessed.
+
+    Args:
+        name (str): The name of the model, e.g. ``base``.
+        device (str, optional): The device to load the model on. Defaults to
+            None, which lets the backend choose.
+        backend (str, optional): The name of the :class:`TranscriptionBackend`
+            that loads the model. Defaults to ``stable-ts``.
+        **options: Keyword arguments passed on to the backend's ``load_model()``.
+
+    Returns:
+        WhisperModelHandle: The handle. Call its ``release()`` method when the
+        model is not needed anymore.
+    """
+    key = (backend, name, device, tuple(sorted(options.items())))
+    with _models_lock:
+        _ref_counts[key] = _ref_counts.get(key, 0) + 1
+        lock = _inference_locks.setdefault(key, threading.Lock())
+    return WhisperModelHandle(key, lock)
+
+
+def unload(name: t.Optional[str] = None) -> None:
+    """Frees loaded Whisper models, e.g. after all voiceovers have been
+    synthesized. Existing handles stay valid and load their model again if
+    it is used after all.
+
+    Args:
+        name (str, optional): Only free the models with this name. Defaults to
+            None, which frees all models.
+    """
+    with _models_lock:
+        keys = [key for key in _models if name is None or key[1] == name]
+        models = [_models.pop(key) for key in keys]
+    if models:
+        del models
+        _free_memory()
+
+
+def _free_memory() -> None:
+    gc.collect()
+    # Only if torch has been imported already, by loading a model
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+class TranscriptionBackend(ABC):
+    """Abstract base class for a transcription backend. Backends return word
+    boundaries in the format of :func:`timestamps_to_word_boundaries`.
+
+    The model is taken from the registry of :func:`get_whisper_model`, so it
+    is only loaded when the first audio file is transcribed. Backends that
+    share a model take turns to run it, subclasses implement
+    :meth:`_transcribe` and :meth:`_align`.
+    """
+
+    #: The name used to select the backend
+    name: str
+    #: The modules the backend imports, and the extras that install them
+    required_modules: t.List[str] = []
+    extras: str = "transcribe"
+    #: Whether the backend implements :meth:`align`
+    supports_alignment: bool = False
+
+    def __init__(self, model: str, device: t.Optional[str] = None, **options):
+        """
+        Args:
+            model (str): The name of the Whisper model, e.g. ``base``.
+            device (str, optional): The device to run the model on. Defaults
+                to None, which lets the backend choose.
+            **options: Keyword arguments passed on to :meth:`load_model`.
+        """
+        self.model_name = model
+        self._handle = get_whisper_model(
+            model, device=device, backend=self.name, **options
+        )
+
+    @property
+    def model(self):
+        return self._handle.model
+
+    @property
+    def cache_key(self) -> dict:
+        """The settings that the output of the backend depends on."""
+        backend, name, _, options = self._handle.key
+        return {"backend": backend, "model": name, "options": dict(options)}
+
+    @property
+    def uses_gpu(self) -> bool:
+        """Whether the model runs on a GPU, where there is only room for one
+        copy of it."""
+        device = self._handle.key[2]
+        if device is None:
+            return self._gpu_available()
+        return device.startswith("cuda")
+
+    def release(self) -> None:
+        """Gives up the backend's reference to the model."""
+        self._handle.release()
+
+    @staticmethod
+    def _gpu_available() -> bool:
+        """Whether the backend picks a GPU if no device is given."""
+        return False
+
+    @staticmethod
+    @abstractmethod
+    def load_model(name: str, device: t.Optional[str], **options):
+        """Loads a model. Called once per model by the registry."""
+        raise NotImplementedError
+
+    def transcribe(self, audio_path: str, **kwargs) -> t.Tuple[t.List[dict], str]:
+        """Transcribes an audio file.
+
+        Args:
+            audio_path (str): The audio file.
+            **kwargs: Keyword arguments for the backend's transcribe() function.
+
+        Returns:
+            Tuple[List[dict], str]: The word boundaries and the transcribed text.
+        """
+        with self._handle.lock:
+            return self._transcribe(audio_path, **kwargs)
+
+    def align(self, audio_path: str, text: str, language: str) -> t.List[dict]:
+        """Aligns a known text to an audio file.
+
+        Args:
+            audio_path (str): The audio file.
+            text (str): The text spoken in the audio.
+            language (str): The language of the text.
+
+        Returns:
+            List[dict]: The word boundaries, with text offsets into ``text``.
+        """
+        with self._handle.lock:
+            return self._align(audio_path, text, language)
+
+    @abstractmethod
+    def _transcribe(self, audio_path: str, **kwargs) -> t.Tuple[t.List[dict], str]:
+        """Implements :meth:`transcribe`, called with the model's lock held."""
+        raise NotImplementedError
+
+    def _align(self, audio_path: str, text: str, language: str) -> t.List[dict]:
+        """Implements :meth:`align`, called with the model's lock held."""
+        raise NotImplementedError(f"{self.name} does not support alignment")
+
+
+class StableTSBackend(TranscriptionBackend):
+    """Transcribes with `stable-ts <https://github.com/jianfch/stable-ts>`__ on
+    top of the PyTorch implementation of Whisper."""
+
+    name = "stable-ts"
+    required_modules = ["whisper", "stable_whisper"]
+    extras = "transcribe"
+    supports_alignment = True
+
+    @staticmethod
+    def load_model(name: str, device: t.Optional[str], **options):
+        import stable_whisper
+
+        return stable_whisper.load_model(name, device=device, **options)
+
+    @staticmethod
+    def _gpu_available() -> bool:
+        if importlib.util.find_spec("torch") is None:
+            return False
+        import torch
+
+        return torch.cuda.is_available()
+
+    def _transcribe(self, audio_path: str, **kwargs) -> t.Tuple[t.List[dict], str]:
+        result = self.model.transcribe(audio_path, **kwargs)
+        word_boundaries = timestamps_to_word_boundaries(result.segments_to_dicts())
+        return word_boundaries, result.text
+
+    def _align(self, audio_path: str, text: str, language: str) -> t.List[dict]:
+        result = self.model.align(audio_path, text, language=language)
+        return aligned_timestamps_to_word_boundaries(result.segments_to_dicts(), text)
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """Transcribes with `faster-whisper <https://github.com/SYSTRAN/faster-whisper>`__,
+    a CTranslate2 implementation of Whisper. It uses int8 quantization by
+    default, which makes it considerably faster than PyTorch on CPUs."""
+
+    name = "faster-whisper"
+    required_modules = ["faster_whisper"]
+    extras = "faster-whisper"
+
+    def __init__(self, model: str, device: t.Optional[str] = None, **options):
+        options.setdefault("compute_type", "int8")
+        super().__init__(model, device=device, **options)
+
+    @staticmethod
+    def load_model(name: str, device: t.Optional[str], **options):
+        from faster_whisper import WhisperModel
+
+        return WhisperModel(name, device=device or "auto", **options)
+
+    @staticmethod
+    def _gpu_available() -> bool:
+        if importlib.util.find_spec("ctranslate2") is None:
+            return False
+        import ctranslate2
+
+        return ctranslate2.get_cuda_device_count() > 0
+
+    def _transcribe(self, audio_path: str, **kwargs) -> t.Tuple[t.List[dict], str]:
+        segments, _ = self.model.transcribe(audio_path, word_timestamps=True, **kwargs)
+        segments = list(segments)
+        timestamps = [
+            {"words": [{"word": w.word, "start": w.start} for w in segment.words]}
+            for segment in segments
+        ]
+        text = "".join(segment.text for segment in segments)
+        return timestamps_to_word_boundaries(timestamps), text
+
+
+#: The available transcription backends, by name
+BACKENDS: t.Dict[str, t.Type[TranscriptionBackend]] = {
+    StableTSBackend.name: StableTSBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def get_transcription_backend(
+    model: str, backend: t.Optional[str] = None, **options
+) -> TranscriptionBackend:
+    """Creates a transcription backend.
+
+    Args:
+        model (str): The name of the Whisper model. The backend can be
+            selected with a prefix, e.g. ``faster-whisper:base``.
+        backend (str, optional): The name of the backend, one of the keys of
+            :data:`BACKENDS`. Defaults to None, which means the prefix of
+            ``model``, or ``stable-ts`` if it has none.
+        **options: Keyword arguments passed on to the backend.
+
+    Returns:
+        TranscriptionBackend: The backend.
+    """
+    if backend is None:
+        backend, _, name = model.rpartition(":")
+        backend = backend or StableTSBackend.name
+    else:
+        name = model
+
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown transcription backend {backend}, "
+            f"choose one of {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[backend](name, **options)
+
+
+# The backend of a transcription worker process
+_worker_backend: t.Optional[TranscriptionBackend] = None
+
+
+def _init_worker(key: ModelKey, num_threads: int) -> None:
+    # Workers share the cores, so each one only uses its share of them
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+    global _worker_backend
+    backend, name, device, options = key
+    _worker_backend = BACKENDS[backend](name, device=device, **dict(options))
+    # Load the model once, before the first file arrives
+    _worker_backend.model
+
+
+def _run_worker(
+    audio_path: str, kwargs: dict, text: t.Optional[str], language: str
+) -> t.Tuple[t.List[dict], t.Optional[str]]:
+    if text is None:
+        return _worker_backend.transcribe(audio_path, **kwargs)
+    return _worker_backend.align(audio_path, text, language=language), None
+
+
+#: The default maximum number of transcription processes, each of them holds
+#: a copy of the model
+DEFAULT_MAX_WORKERS = 4
+
+
+def get_num_workers(
+    backend: TranscriptionBackend, num_files: int, max_workers: t.Optional[int] = None
+) -> int:
+    """Returns the number of processes to transcribe ``num_files`` files in.
+
+    Args:
+        backend (TranscriptionBackend): The backend whose model the processes
+            load.
+        num_files (int): The number of files.
+        max_workers (int, optional): The maximum number of processes. Defaults
+            to None, which means :data:`DEFAULT_MAX_WORKERS`, or 1 if the model
+            runs on a GPU.
+
+    Returns:
+        int: The number of processes, at most the number of CPU cores.
+    """
+    num_cores = os.cpu_count() or 1
+    if max_workers is None:
+        max_workers = 1 if backend.uses_gpu else DEFAULT_MAX_WORKERS
+    return max(1, min(max_workers, num_cores, num_files))
+
+
+def transcribe_batch(
+    backend: TranscriptionBackend,
+    audio_paths: t.List[str],
+    kwargs: dict = {},
+    texts: t.Optional[t.List[str]] = None,
+    language: str = "en",
+    max_workers: t.Optional[int] = None,
+) -> t.List[t.Tuple[t.List[dict], t.Optional[str]]]:
+    """Transcribes many audio files in a pool of processes. Each process
+    loads the model of ``backend`` once.
+
+    Args:
+        backend (TranscriptionBackend): The backend whose model and settings
+            the processes use.
+        audio_paths (List[str]): The audio files to transcribe.
+        kwargs (dict, optional): Keyword arguments for the backend's
+            transcribe() function. Defaults to {}.
+        texts (List[str], optional): The texts spoken in the audio files. If
+            given, the texts are aligned to the audio instead. Defaults to None.
+        language (str, optional): The language of ``texts``. Defaults to ``en``.
+        max_workers (int, optional): The maximum number of processes, see
+            :func:`get_num_workers`. Defaults to None.
+
+    Returns:
+        List[Tuple[List[dict], Optional[str]]]: The word boundaries and the
+        transcribed text of each file, in the order of ``audio_paths``. The
+        text is None for aligned files.
+    """
+    if texts is None:
+        texts = [None] * len(audio_paths)
+    num_cores = os.cpu_count() or 1
+    max_workers = get_num_workers(backend, len(audio_paths), max_workers)
+
+    logger.info(
+        f"Transcribing {len(audio_paths)} voiceovers in {max_workers} processes"
+    )
+    # Forking a process that runs threads, e.g. a loaded model, can deadlock
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(backend._handle.key, max(1, num_cores // max_workers)),
+    ) as executor:
+        futures = [
+            executor.submit(_run_worker, audio_path, kwargs, text, language)
+            for audio_path, text in zip(audio_paths, texts)
+        ]
+        return [future.result() for future in futures]
@@ -1,11 +1,21 @@
 from math import ceil
+from concurrent.futures import Future
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Optional, Generator
+import asyncio
+import hashlib
+import inspect
+import json
+import os
 import re
+import sys
+import threading
 import typing as t
 
-from manim import Scene, config
+from manim import Scene, config, logger
+from manim_voiceover.defaults import DEFAULT_VOICEOVER_MANIFEST_DIR
+from manim_voiceover.prefetch import extract_voiceovers
 from manim_voiceover.services.base import SpeechService
 from manim_voiceover.tracker import VoiceoverTracker
 from manim_voiceover.helper import chunks, remove_bookmarks
@@ -26,6 +36,8 @@ class VoiceoverScene(Scene):
         self,
         speech_service: SpeechService,
         create_subcaption: bool = True,
+        prefetch: bool = False,
+        prefetch_workers: int = 8,
     ) -> None:
         """Sets the speech service to be used for the voiceover. This method
         should be called before adding any voiceover to the scene.
@@ -34,6 +46,8 @@ class VoiceoverScene(Scene):
             speech_service (SpeechService): The speech service to be used.
             create_subcaption (bool, optional): Whether to create subcaptions for the scene. Defaults to True. If `config.save_last_frame` is True, the argument is
             ignored and no subcaptions will be created.
+            prefetch (bool, optional): Whether to synthesize the voiceovers of the previous render of this scene in the background, while the scene is rendered. On the first render, the voiceovers with literal texts are found in the source code of the scene. Voiceovers that are not used anymore are discarded. Defaults to False.
+            prefetch_workers (int, optional): The number of voiceovers to synthesize at the same time when prefetching. All of them are driven by a single event loop, see :meth:`~.SpeechService.agenerate_from_text`. Defaults to 8.
         """
         self.speech_service = speech_service
         self.current_tracker = None
@@ -42,6 +56,121 @@ class VoiceoverScene(Scene):
         else:
             self.create_subcaption = create_subcaption
 
+        if not hasattr(self, "_voiceover_manifest"):
+            self._voiceover_manifest = []
+            self._prefetched = {}
+            self._prefetch_loop = None
+            # Whether to record the voiceovers for the next render
+            self._prefetch_enabled = False
+        if prefetch:
+            self._start_prefetch(prefetch_workers)
+
+    def _get_manifest_path(self) -> Path:
+        # Scenes with the same name in different files get different manifests
+        scene_class = type(self)
+        try:
+            source_path = os.path.abspath(inspect.getsourcefile(scene_class))
+        except TypeError:
+            source_path = ""
+        source_hash = hashlib.sha256(source_path.encode("utf-8")).hexdigest()[:8]
+        return (
+            Path(self.speech_service.cache_dir)
+            / DEFAULT_VOICEOVER_MANIFEST_DIR
+            / f"{scene_class.__module__}.{scene_class.__name__}-{source_hash}.json"
+        )
+
+    def _get_prefetch_key(self, text: str, kwargs: dict) -> str:
+        # Raises TypeError if the arguments cannot be stored in the manifest
+        return json.dumps(
+            [type(self.speech_service).__name__, " ".join(text.split()), kwargs],
+            sort_keys=True,
+        )
+
+    def _start_prefetch(self, max_workers: int) -> None:
+        """Submits the voiceovers recorded in the manifest of the previous
+        render to an event loop running in a background thread."""
+        if not self.speech_service.thread_safe:
+            logger.warning(
+                f"{type(self.speech_service).__name__} does not support "
+                "synthesizing voiceovers in parallel, prefetching is disabled."
+            )
+            return
+        self._prefetch_enabled = True
+
+        manifest_path = self._get_manifest_path()
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+        else:
+            # First render, find the voiceovers in the source code instead
+            module = sys.modules[type(self).__module__]
+            try:
+                with open(inspect.getsourcefile(type(self)), "r") as f:
+                    source = f.read()
+                manifest = extract_voiceovers(source, type(self).__name__, vars(module))
+            except (OSError, TypeError, ValueError, SyntaxError):
+                return
+
+        self._prefetch_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._prefetch_loop.run_forever, daemon=True).start()
+        self._prefetch_semaphore = None
+
+        async def prefetch_voiceover(text: str, kwargs: dict) -> dict:
+            # Created here, so that it belongs to the prefetch loop
+            if self._prefetch_semaphore is None:
+                self._prefetch_semaphore = asyncio.Semaphore(max_workers)
+            async with self._prefetch_semaphore:
+                return await self.speech_service._wrap_agenerate_from_text(
+                    text, **kwargs
+                )
+
+        service_name = type(self.speech_service).__name__
+        for item in manifest:
+            if item.get("service", service_name) != service_name:
+                continue
+            key = self._get_prefetch_key(item["text"], item["kwargs"])
+            if key in self._prefetched:
+                continue
+            self._prefetched[key] = asyncio.run_coroutine_threadsafe(
+                prefetch_voiceover(item["text"], item["kwargs"]),
+                self._prefetch_loop,
+            )
+
+    def _get_prefetched(self, text: str, kwargs: dict) -> Optional[Future]:
+        if not self._prefetch_enabled:
+            return None
+        try:
+            key = self._get_prefetch_key(text, kwargs)
+        except TypeError:
+            return None
+        self._voiceover_manifest.append(
+            {
+                "service": type(self.speech_service).__name__,
+                "text": text,
+                "kwargs": kwargs,
+            }
+        )
+        return self._prefetched.pop(key, None)
+
+    def tear_down(self) -> None:
+        super().tear_down()
+        if not hasattr(self, "speech_service"):
+            return
+
+        # Voiceovers from the previous render that were not used anymore
+        for future in self._prefetched.values():
+            future.cancel()
+        if self._prefetch_loop is not None:
+            self._prefetch_loop.call_soon_threadsafe(self._prefetch_loop.stop)
+
+        # Save the voiceovers of this render for the next one to prefetch
+        if not self._prefetch_enabled:
+            return
+        manifest_path = self._get_manifest_path()
+        os.makedirs(manifest_path.parent, exist_ok=True)
+        with open(manifest_path, "w") as f:
+            json.dump(self._voiceover_manifest, f, indent=2)
+
     def add_voiceover_text(
         self,
         text: str,
@@ -66,7 +195,11 @@ class VoiceoverScene(Scene):
                 "You need to call init_voiceover() before adding a voiceover."
             )
 
-        dict_ = self.speech_service._wrap_generate_from_text(text, **kwargs)
+        future = self._get_prefetched(text, kwargs)
+        if future is not None:
+            dict_ = future.result()
+        else:
+            dict_ = self.speech_service._wrap_generate_from_text(text, **kwargs)
         tracker = VoiceoverTracker(self, dict_, self.speech_service.cache_dir)
         self.renderer.skip_animations = self.renderer._original_skipping_status
         self.add_sound(str(Path(self.speech_service.cache_dir) / dict_["final_audio"]))
@@ -166,6 +299,14 @@ class VoiceoverScene(Scene):
         """
         self.safe_wait(self.current_tracker.time_until_bookmark(mark))
 
+    def wait_until_word(self, index: int) -> None:
+        """Waits until a word is spoken.
+
+        Args:
+            index (int): The index of the word in the tracker's `word_index`.
+        """
+        self.safe_wait(self.current_tracker.time_until_word(index))
+
     @contextmanager
     def voiceover(
         self, text: t.Optional[str] = None, ssml: t.Optional[str] = None, **kwargs
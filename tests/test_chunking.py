@@ -0,0 +1,103 @@
+from manim_voiceover.helper import split_sentences
+from manim_voiceover.services import base
+from manim_voiceover.services.base import SpeechService
+from manim_voiceover.tracker import AUDIO_OFFSET_RESOLUTION
+
+
+class DummyService(SpeechService):
+    def generate_from_text(self, text, cache_dir=None, path=None, **kwargs):
+        raise NotImplementedError
+
+
+def test_split_sentences():
+    assert split_sentences("Hello world. How are you? Fine!") == [
+        "Hello world.",
+        "How are you?",
+        "Fine!",
+    ]
+    assert split_sentences("Dr. Smith paid for e.g. this.") == [
+        "Dr. Smith paid for e.g. this."
+    ]
+    assert split_sentences("Ask J. R. Tolkien. He knows.") == [
+        "Ask J. R. Tolkien.",
+        "He knows.",
+    ]
+    assert split_sentences("Pi is approx. 3.14. it is irrational.") == [
+        "Pi is approx. 3.14. it is irrational."
+    ]
+    assert split_sentences("First. <bookmark mark='A'/>Second.") == [
+        "First.",
+        "<bookmark mark='A'/>Second.",
+    ]
+    assert split_sentences("Hi! <bookmark mark='A'/>") == ["Hi! <bookmark mark='A'/>"]
+    assert split_sentences("Hi. Bye. <bookmark mark='A'/> <bookmark mark='B'/>") == [
+        "Hi.",
+        "Bye. <bookmark mark='A'/> <bookmark mark='B'/>",
+    ]
+    assert split_sentences("I said no. Then I left.") == [
+        "I said no.",
+        "Then I left.",
+    ]
+
+
+def test_join_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        base, "get_concatenated_audio", lambda paths, output_dir: "joined.mp3"
+    )
+    service = DummyService(cache_dir=str(tmp_path))
+
+    def chunk(text, duration, word_boundaries, bookmarks=None):
+        dict_ = {
+            "input_text": text,
+            "final_audio": text + ".mp3",
+            "word_boundaries": [
+                {
+                    "audio_offset": int(t * AUDIO_OFFSET_RESOLUTION),
+                    "text_offset": offset,
+                    "word_length": len(word),
+                    "text": word,
+                    "boundary_type": "Word",
+                }
+                for word, offset, t in word_boundaries
+            ],
+            "timing": {"duration": duration},
+        }
+        if bookmarks:
+            dict_["bookmarks"] = bookmarks
+        return dict_
+
+    text = "Hello world. <bookmark mark='A'/>Bye now."
+    joined = service._join_chunks(
+        text,
+        [
+            chunk("Hello world.", 1.5, [("Hello", 0, 0.0), ("world.", 6, 0.5)]),
+            chunk(
+                "<bookmark mark='A'/>Bye now.",
+                2.0,
+                [("Bye", 0, 0.1), ("now.", 4, 0.6)],
+                bookmarks={"A": 0},
+            ),
+        ],
+    )
+
+    assert joined["final_audio"] == "joined.mp3"
+    assert [
+        (wb["text"], wb["text_offset"], wb["audio_offset"])
+        for wb in joined["word_boundaries"]
+    ] == [
+        ("Hello", 0, 0),
+        ("world.", 6, int(0.5 * AUDIO_OFFSET_RESOLUTION)),
+        (
+            "Bye",
+            13,
+            int(1.5 * AUDIO_OFFSET_RESOLUTION) + int(0.1 * AUDIO_OFFSET_RESOLUTION),
+        ),
+        (
+            "now.",
+            17,
+            int(1.5 * AUDIO_OFFSET_RESOLUTION) + int(0.6 * AUDIO_OFFSET_RESOLUTION),
+        ),
+    ]
+    assert joined["bookmarks"] == {"A": int(1.5 * AUDIO_OFFSET_RESOLUTION)}
+    assert joined["timing"]["duration"] == 3.5
+    assert joined["timing"]["bookmark_times"] == {"A": 1.5}
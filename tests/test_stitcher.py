@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+
+from manim_voiceover.services.stitcher import get_nonsilent_ranges
+
+
+def make_segment(rng, frame_rate, sample_width, channels):
+    max_amplitude = 1 << (8 * sample_width - 1)
+    parts = []
+    for _ in range(rng.integers(1, 8)):
+        n_frames = int(rng.integers(50, 3000) * frame_rate / 1000)
+        if rng.random() < 0.5:
+            parts.append(np.zeros(n_frames * channels))
+        else:
+            volume = 10 ** (rng.uniform(-60, -3) / 20)
+            t = np.arange(n_frames * channels) // channels / frame_rate
+            parts.append(volume * np.sin(2 * np.pi * rng.uniform(100, 900) * t))
+    samples = (np.concatenate(parts) * (max_amplitude - 1)).astype(
+        {1: np.int8, 2: np.int16, 4: np.int32}[sample_width]
+    )
+    return AudioSegment(
+        data=samples.tobytes(),
+        sample_width=sample_width,
+        frame_rate=frame_rate,
+        channels=channels,
+    )
+
+
+def get_ranges(segment, min_silence_len, silence_thresh, seek_step, block_len):
+    samples = np.frombuffer(
+        segment.raw_data,
+        dtype={1: np.int8, 2: np.int16, 4: np.int32}[segment.sample_width],
+    )
+    block_len *= segment.channels
+    return get_nonsilent_ranges(
+        (samples[i : i + block_len] for i in range(0, len(samples), block_len)),
+        segment.frame_rate,
+        segment.channels,
+        segment.sample_width,
+        min_silence_len=min_silence_len,
+        silence_thresh=silence_thresh,
+        keep_silence=0,
+        seek_step=seek_step,
+    )
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_nonsilent_ranges_match_pydub(seed):
+    rng = np.random.default_rng(seed)
+    segment = make_segment(
+        rng,
+        frame_rate=int(rng.choice([8000, 16000, 22050, 44100])),
+        sample_width=int(rng.choice([1, 2, 4])),
+        channels=int(rng.choice([1, 2])),
+    )
+    min_silence_len = int(rng.choice([100, 300, 500, 1000]))
+    seek_step = int(rng.choice([1, 7, 10, 25, 50]))
+    silence_thresh = int(rng.choice([-16, -30, -45]))
+
+    expected = detect_nonsilent(segment, min_silence_len, silence_thresh, seek_step)
+    assert get_ranges(
+        segment, min_silence_len, silence_thresh, seek_step, int(rng.integers(1, 5000))
+    ) == [list(r) for r in expected]
+
+
+def test_trailing_window_between_cells():
+    # The last window starts at 13298 ms, between the 50 ms cells
+    frame_rate = 16000
+    samples = np.zeros(13598 * frame_rate // 1000, dtype=np.int16)
+    samples[-40 * frame_rate // 1000 :] = 20000
+    segment = AudioSegment(
+        data=samples.tobytes(), sample_width=2, frame_rate=frame_rate, channels=1
+    )
+
+    expected = detect_nonsilent(segment, 300, -16, 50)
+    assert expected[-1] == [13550, 13598]
+    assert get_ranges(segment, 300, -16, 50, 4096) == expected